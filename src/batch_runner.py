@@ -0,0 +1,330 @@
+"""
+Headless battle runner for running many battles, e.g. for balance testing.
+Battles run to completion in a pool of worker processes, without output,
+and their results are streamed back in order.
+
+Run with `python batch_runner.py --battles 100000 --workers 8` to battle
+random teams of default-trigger bois and print a summary.
+"""
+
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union, cast
+import argparse
+import contextlib
+import itertools
+import multiprocessing
+import os
+import random
+import time
+
+from battle_cache import BattleCache, Outcome, battle_key, stat_pair_first_id
+from battle_system import BattleSystem
+from boi import BoiBuilder
+from pack import Pack
+from resolver import VanillaTeam, resolve_vanilla
+from snapshot import decode_team
+from team import Team
+
+# Either (attack, health) pairs for default-trigger bois, or a team snapshot
+# whose bois come from the runner's pack, see snapshot.encode_team
+TeamDescriptor = Union[VanillaTeam, bytes]
+Matchup = Tuple[TeamDescriptor, TeamDescriptor]
+# Type name, attack and health of a surviving boi
+Survivor = Tuple[str, int, int]
+
+DEFAULT_MAX_TURNS = 1000
+DEFAULT_CHUNK_SIZE = 64
+
+# Set in each worker process by _init_worker
+_worker_pack: Optional[Pack] = None
+_worker_cache: Optional[BattleCache] = None
+
+
+class BattleResult:
+    """
+    The outcome of one battle of a batch.
+    Winner is None for a draw, including battles that ran out of turns or
+    whose triggers looped.
+    """
+
+    __slots__ = ("index", "winner", "turns", "survivors", "timed_out")
+
+    def __init__(
+        self,
+        index: int,
+        winner: Optional[int],
+        turns: int,
+        survivors: Tuple[List[Survivor], List[Survivor]],
+        timed_out: bool = False,
+    ) -> None:
+        self.index = index
+        self.winner = winner
+        self.turns = turns
+        self.survivors = survivors
+        self.timed_out = timed_out
+
+    def __repr__(self):
+        return f"BattleResult({self.index}, winner={self.winner}, turns={self.turns})"
+
+
+def build_team(
+    descriptor: TeamDescriptor,
+    pack: Optional[Pack] = None,
+    ids: Optional[Iterator[int]] = None,
+) -> Team:
+    """
+    Builds the team a descriptor describes.
+    Snapshots need the pack their bois were built from, and keep their ids.
+    The bois of (attack, health) pairs get ids from ids, if given.
+    """
+    if _is_snapshot(descriptor):
+        if pack is None:
+            raise ValueError("Team snapshots need a pack.")
+        return decode_team(descriptor, pack)
+    return Team(
+        [
+            BoiBuilder()
+            .set_type_name(f"Boi {i}")
+            .set_attack(attack)
+            .set_health(health)
+            .build(ids)
+            for i, (attack, health) in enumerate(descriptor)
+        ]
+    )
+
+
+def run_battle(
+    index: int,
+    matchup: Matchup,
+    pack: Optional[Pack] = None,
+    max_turns: int = DEFAULT_MAX_TURNS,
+    use_resolver: bool = True,
+    seed: Optional[int] = None,
+    cache: Optional[BattleCache] = None,
+) -> BattleResult:
+    """
+    Runs one battle to completion, with anything its triggers print discarded.
+    Battles between default-trigger teams are resolved without building bois,
+    unless use_resolver is unset, see BattleSystem.
+    seed seeds the battle's rng. With a cache, a battle that has been run
+    before with the same teams, seed and max_turns isn't run again. Without
+    a seed, only battles between vanilla bois are cached, since others may
+    go differently each time.
+    """
+    teams = None
+    if cache is not None and seed is None and any(map(_is_snapshot, matchup)):
+        teams = _build_teams(matchup, pack)
+        if not all(boi.is_vanilla() for team in teams[:2] for boi in team.bois):
+            cache = None
+    if cache is None:
+        return _run_battle(index, matchup, pack, max_turns, use_resolver, seed, teams)
+    key = battle_key(matchup, max_turns, seed, pack)
+    outcome = cache.get(key)
+    if outcome is not None:
+        winner, turns, (survivors0, survivors1), timed_out = outcome
+        survivors = (list(survivors0), list(survivors1))
+        return BattleResult(index, winner, turns, survivors, timed_out)
+    result = _run_battle(index, matchup, pack, max_turns, use_resolver, seed, teams)
+    cache.put(key, _outcome(result))
+    return result
+
+
+def _run_battle(
+    index: int,
+    matchup: Matchup,
+    pack: Optional[Pack],
+    max_turns: int,
+    use_resolver: bool,
+    seed: Optional[int],
+    teams: Optional[Tuple[Team, Team, int]],
+) -> BattleResult:
+    """
+    Runs one battle, between the given teams if they were already built.
+    """
+    if use_resolver and not any(map(_is_snapshot, matchup)):
+        return _resolve_battle(index, matchup, max_turns)
+    if teams is None:
+        teams = _build_teams(matchup, pack)
+    team0, team1, boi_id_seed = teams
+    # print does nothing while sys.stdout is None
+    with contextlib.redirect_stdout(None):
+        battle = BattleSystem(
+            team0,
+            team1,
+            draw_on_runaway=True,
+            use_resolver=use_resolver,
+            seed=seed,
+            boi_id_seed=boi_id_seed,
+        )
+        battle.run_to_end(max_turns)
+    survivors = (
+        [(boi.type_name, boi.attack, boi.health) for boi in team0.bois],
+        [(boi.type_name, boi.attack, boi.health) for boi in team1.bois],
+    )
+    return BattleResult(
+        index,
+        battle.get_winner(),
+        battle.turn,
+        survivors,
+        timed_out=not battle.is_battle_over(),
+    )
+
+
+def _build_teams(matchup: Matchup, pack: Optional[Pack]) -> Tuple[Team, Team, int]:
+    """
+    Builds both teams of a matchup, giving the bois of (attack, health) pairs
+    the ids battle_key expects. Also returns the first id left for bois
+    summoned in battle, so a battle's ids don't depend on the process.
+    """
+    ids = itertools.count(stat_pair_first_id(matchup))
+    team0 = build_team(matchup[0], pack, ids)
+    team1 = build_team(matchup[1], pack, ids)
+    return team0, team1, next(ids)
+
+
+def _outcome(result: BattleResult) -> Outcome:
+    survivors0, survivors1 = result.survivors
+    return (
+        result.winner,
+        result.turns,
+        (tuple(survivors0), tuple(survivors1)),
+        result.timed_out,
+    )
+
+
+def _is_snapshot(descriptor: TeamDescriptor) -> bool:
+    return isinstance(descriptor, (bytes, bytearray, memoryview))
+
+
+def _resolve_battle(index: int, matchup: Matchup, max_turns: int) -> BattleResult:
+    """
+    Runs a battle between default-trigger teams with resolve_vanilla.
+    """
+    team0, team1 = cast(Tuple[VanillaTeam, VanillaTeam], matchup)
+    outcome = resolve_vanilla(team0, team1, max_turns)
+    survivors: Tuple[List[Survivor], List[Survivor]] = ([], [])
+    for side in (0, 1):
+        # Named like the bois build_team makes
+        positions = itertools.count(outcome.dead[side])
+        for position, (attack, health) in zip(positions, outcome.survivors(side)):
+            survivors[side].append((f"Boi {position}", attack, health))
+    return BattleResult(
+        index, outcome.winner, outcome.turns, survivors, outcome.timed_out
+    )
+
+
+def run_battles(
+    matchups: Iterable[Matchup],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    pack_factory: Optional[Callable[[], Pack]] = None,
+    max_turns: int = DEFAULT_MAX_TURNS,
+    seed: Optional[int] = None,
+    cache: Optional[BattleCache] = None,
+) -> Iterator[BattleResult]:
+    """
+    Runs every matchup to completion and yields the results in order, as
+    they come in. Matchups are read lazily, so there can be any number.
+    Uses a pool of worker processes, one per core by default, which are
+    sent chunk_size matchups at a time. With workers=1 the battles run in
+    this process instead.
+    Snapshot descriptors are decoded with the pack that pack_factory makes.
+    Each worker calls it once, so it must be a module-level function.
+    Every battle is run with the same seed, see run_battle. With a cache,
+    each worker opens its own cache of the same size and path instead, so
+    they share outcomes through the cache's file, if it has one, and the
+    cache's own counters only count battles run in this process.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1:
+        pack = None if pack_factory is None else pack_factory()
+        for index, matchup in enumerate(matchups):
+            yield run_battle(index, matchup, pack, max_turns, seed=seed, cache=cache)
+        return
+    cache_config = None if cache is None else (cache.max_size, cache.path)
+    with multiprocessing.Pool(
+        workers, initializer=_init_worker, initargs=(pack_factory, cache_config)
+    ) as pool:
+        jobs = (
+            (index, matchup, max_turns, seed) for index, matchup in enumerate(matchups)
+        )
+        yield from pool.imap(_run_job, jobs, chunk_size)
+
+
+def _init_worker(
+    pack_factory: Optional[Callable[[], Pack]],
+    cache_config: Optional[Tuple[int, Optional[str]]],
+) -> None:
+    global _worker_pack, _worker_cache  # pylint: disable=global-statement
+    _worker_pack = None if pack_factory is None else pack_factory()
+    _worker_cache = None if cache_config is None else BattleCache(*cache_config)
+
+
+def _run_job(job: Tuple[int, Matchup, int, Optional[int]]) -> BattleResult:
+    index, matchup, max_turns, seed = job
+    return run_battle(
+        index, matchup, _worker_pack, max_turns, seed=seed, cache=_worker_cache
+    )
+
+
+def random_matchups(
+    num_battles: int, team_size: int = 5, max_stat: int = 10, seed: int = 0
+) -> Iterator[Matchup]:
+    """
+    Yields matchups of random default-trigger teams.
+    """
+    rng = random.Random(seed)
+
+    def random_team() -> List[Tuple[int, int]]:
+        return [
+            (rng.randint(1, max_stat), rng.randint(1, max_stat))
+            for _ in range(team_size)
+        ]
+
+    for _ in range(num_battles):
+        yield random_team(), random_team()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Battle random teams and print how they went."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--battles", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--team-size", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache-size", type=int, default=0)
+    parser.add_argument("--cache-path", default=None)
+    args = parser.parse_args(argv)
+
+    cache = None
+    if args.cache_size or args.cache_path:
+        cache = BattleCache(args.cache_size, args.cache_path)
+
+    wins = [0, 0]
+    draws = 0
+    turns = 0
+    start = time.perf_counter()
+    for result in run_battles(
+        random_matchups(args.battles, args.team_size, seed=args.seed),
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        cache=cache,
+    ):
+        if result.winner is None:
+            draws += 1
+        else:
+            wins[result.winner] += 1
+        turns += result.turns
+    elapsed = time.perf_counter() - start
+
+    print(f"battles: {args.battles:,}")
+    print(f"team 1 wins: {wins[0]:,}, team 2 wins: {wins[1]:,}, draws: {draws:,}")
+    print(f"mean turns: {turns / max(args.battles, 1):.2f}")
+    print(f"battles per sec: {args.battles / elapsed:,.1f}")
+    if cache is not None and args.workers == 1:
+        print(f"cache: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
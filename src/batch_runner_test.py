@@ -0,0 +1,68 @@
+import unittest
+
+from batch_runner import random_matchups, run_battles
+from battle_demo import ant_faint_callback, dodo_start_turn_callback
+from boi import BoiBuilder
+from pack import Pack
+from snapshot import encode_team
+from team import Team
+
+
+def make_pack():
+    """Build a pack of two demo bois with triggers that print"""
+    pack = Pack("Test Pack", 1)
+    pack.add_boi_builder(
+        BoiBuilder()
+        .set_type_name("Ant")
+        .set_attack(2)
+        .set_health(1)
+        .add_trigger("death", ant_faint_callback),
+        1,
+    )
+    pack.add_boi_builder(
+        BoiBuilder()
+        .set_type_name("Dodo")
+        .set_attack(2)
+        .set_health(3)
+        .add_trigger("battle_turn_start", dodo_start_turn_callback),
+        1,
+    )
+    return pack
+
+
+class BatchRunnerTest(unittest.TestCase):
+    """Test cases for running batches of battles"""
+
+    def test_workers_match_a_single_process(self):
+        """Test that a pool gives the same results, in order, as one process"""
+        matchups = list(random_matchups(50, seed=1))
+        expected = list(run_battles(matchups, workers=1))
+        results = list(run_battles(iter(matchups), workers=2, chunk_size=7))
+        self.assertEqual([result.index for result in results], list(range(50)))
+        self.assertEqual(
+            [(r.winner, r.turns, r.survivors) for r in results],
+            [(r.winner, r.turns, r.survivors) for r in expected],
+        )
+        self.assertTrue(all(result.winner is not None for result in results))
+
+    def test_snapshot_teams_and_stalemates(self):
+        """Test that snapshot teams use the pack, and stalemates end as draws"""
+        pack = make_pack()
+        ant, dodo = pack.boi_builders
+        team0 = encode_team(Team([dodo.build(), dodo.build()]), pack)
+        team1 = encode_team(Team([ant.build(), ant.build(), ant.build()]), pack)
+        matchups = [(team0, team1), ([(0, 1)], [(0, 1)])]
+
+        results = list(
+            run_battles(matchups, workers=2, pack_factory=make_pack, max_turns=20)
+        )
+        self.assertEqual(results[0].winner, 0)
+        self.assertEqual(results[0].survivors[0][0][0], "Dodo")
+        self.assertFalse(results[0].timed_out)
+        self.assertIsNone(results[1].winner)
+        self.assertEqual(results[1].turns, 20)
+        self.assertTrue(results[1].timed_out)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,252 @@
+"""
+Cache of battle outcomes, so that matchups that are battled again and again,
+e.g. by matchmaking and balance tools, are only battled once.
+
+Outcomes are keyed by canonical signatures of the teams, which hold what
+decides a battle, and by the seed of battles whose triggers are random.
+They are kept in memory, least recently used first out, and optionally in
+an SQLite file, which several processes can share.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import itertools
+import json
+import sqlite3
+import struct
+
+from pack import Pack
+from resolver import VanillaTeam
+from snapshot import DEFAULT_EFFECT, team_boi_fields
+
+# Winner, turns, each team's surviving bois as (type name, attack, health),
+# and whether the battle ran out of turns, see batch_runner.BattleResult
+Outcome = Tuple[Optional[int], int, Tuple[Tuple[Tuple[str, int, int], ...], ...], bool]
+
+DEFAULT_CACHE_SIZE = 100_000
+
+# Turn limit, whether there's a seed, and the seed
+KEY_HEADER = struct.Struct("<iBq")
+COUNT = struct.Struct("<H")
+# Type id, attack, health, level, effect code and build order of a boi
+KEY_BOI = struct.Struct("<HiiBHH")
+
+# Type id of the bois built for (attack, health) pairs
+NO_TYPE = 0xFFFF
+
+
+class BattleCache:
+    """
+    LRU cache of battle outcomes, keyed by battle_key.
+    With a path, outcomes are also stored in an SQLite file there, which
+    outlives the cache and can be shared by the caches of other processes.
+    Outcomes that are only on disk are loaded into memory when they are
+    looked up. The file must be deleted if the pack's builders change.
+    """
+
+    __slots__ = (
+        "max_size",
+        "path",
+        "hits",
+        "disk_hits",
+        "misses",
+        "evictions",
+        "_outcomes",
+        "_store",
+    )
+
+    def __init__(
+        self, max_size: int = DEFAULT_CACHE_SIZE, path: Optional[str] = None
+    ) -> None:
+        self.max_size = max_size
+        self.path = path
+        # Lookups answered from memory or disk, the latter also in disk_hits
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._outcomes: "OrderedDict[bytes, Outcome]" = OrderedDict()
+        self._store = None if path is None else _open_store(path)
+
+    def __len__(self) -> int:
+        return len(self._outcomes)
+
+    def get(self, key: bytes) -> Optional[Outcome]:
+        """
+        Returns the outcome of the battle with the given key, or None if it
+        isn't cached.
+        """
+        outcome = self._outcomes.get(key)
+        if outcome is not None:
+            self._outcomes.move_to_end(key)
+            self.hits += 1
+            return outcome
+        if self._store is not None:
+            row = self._store.execute(
+                "SELECT outcome FROM outcomes WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                outcome = _load_outcome(row[0])
+                self._remember(key, outcome)
+                self.hits += 1
+                self.disk_hits += 1
+                return outcome
+        self.misses += 1
+        return None
+
+    def put(self, key: bytes, outcome: Outcome) -> None:
+        """
+        Caches the outcome of the battle with the given key.
+        """
+        self._remember(key, outcome)
+        if self._store is not None:
+            with self._store:
+                self._store.execute(
+                    "INSERT OR REPLACE INTO outcomes VALUES (?, ?)",
+                    (key, json.dumps(outcome)),
+                )
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache's counters, and how many outcomes are in memory.
+        """
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._outcomes),
+        }
+
+    def close(self) -> None:
+        """
+        Closes the cache's file, if it has one. Outcomes in memory are kept.
+        """
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def _remember(self, key: bytes, outcome: Outcome) -> None:
+        """
+        Keeps an outcome in memory, evicting the least recently used if the
+        cache is full.
+        """
+        if self.max_size <= 0:
+            return
+        self._outcomes[key] = outcome
+        self._outcomes.move_to_end(key)
+        if len(self._outcomes) > self.max_size:
+            self._outcomes.popitem(last=False)
+            self.evictions += 1
+
+
+def battle_key(
+    matchup: Sequence[Union[VanillaTeam, bytes]],
+    max_turns: int,
+    seed: Optional[int] = None,
+    pack: Optional[Pack] = None,
+) -> bytes:
+    """
+    Returns the cache key of a battle between two team descriptors, see
+    batch_runner.TeamDescriptor. Snapshot teams are keyed by the name of the
+    pack they are read with, as well as by their signatures.
+    """
+    signature0, signature1 = matchup_signatures(matchup)
+    pack_name = b"" if pack is None else pack.name.encode()
+    return b"".join(
+        (
+            pack_name,
+            b"\0",
+            KEY_HEADER.pack(max_turns, seed is not None, seed or 0),
+            signature0,
+            signature1,
+        )
+    )
+
+
+def matchup_signatures(
+    matchup: Sequence[Union[VanillaTeam, bytes]],
+) -> Tuple[bytes, bytes]:
+    """
+    Returns canonical signatures of both teams of a matchup: the type id,
+    attack, health, level and effect code of each boi, in order.
+    Bois are also ordered by id, as that decides which of two equal bois
+    acts first. Ids themselves are left out, so each is replaced by its
+    rank among the ids of both teams. The bois of (attack, health) pairs
+    are given the ids batch_runner builds them with, see
+    stat_pair_first_id.
+    """
+    teams = [_snapshot_boi_fields(descriptor) for descriptor in matchup]
+    ids = itertools.count(_first_stat_pair_id(teams))
+    for side, descriptor in enumerate(matchup):
+        if not _is_snapshot(descriptor):
+            teams[side] = [
+                (next(ids), NO_TYPE, attack, health, 1, DEFAULT_EFFECT)
+                for attack, health in descriptor
+            ]
+    boi_ids = sorted(fields[0] for team in teams for fields in team)
+    ranks = {boi_id: rank for rank, boi_id in enumerate(boi_ids)}
+    signature0, signature1 = (
+        COUNT.pack(len(team))
+        + b"".join(KEY_BOI.pack(*fields[1:], ranks[fields[0]]) for fields in team)
+        for team in teams
+    )
+    return signature0, signature1
+
+
+def stat_pair_first_id(matchup: Sequence[Union[VanillaTeam, bytes]]) -> int:
+    """
+    Returns the id the bois of a matchup's (attack, health) pairs should be
+    built from, team 0's first, so that ties between them and snapshot bois
+    are always broken the same way: just after the highest snapshot boi id.
+    """
+    return _first_stat_pair_id(
+        [_snapshot_boi_fields(descriptor) for descriptor in matchup]
+    )
+
+
+def _first_stat_pair_id(teams: List[List[Tuple[int, ...]]]) -> int:
+    return 1 + max((fields[0] for team in teams for fields in team), default=-1)
+
+
+def _snapshot_boi_fields(
+    descriptor: Union[VanillaTeam, bytes],
+) -> List[Tuple[int, ...]]:
+    """
+    Returns the id, type id, attack, health, level and effect code of each
+    boi of a snapshot team descriptor, or nothing for (attack, health) pairs.
+    """
+    if not _is_snapshot(descriptor):
+        return []
+    return [
+        (boi_id, type_id, attack, health, level, effect_code)
+        for boi_id, type_id, attack, health, level, _, effect_code in (
+            team_boi_fields(descriptor)
+        )
+    ]
+
+
+def _is_snapshot(descriptor: Union[VanillaTeam, bytes]) -> bool:
+    return isinstance(descriptor, (bytes, bytearray, memoryview))
+
+
+def _open_store(path: str) -> sqlite3.Connection:
+    # Processes wait for each other's writes rather than failing
+    store = sqlite3.connect(path, timeout=60)
+    store.execute("PRAGMA journal_mode=WAL")
+    with store:
+        store.execute(
+            "CREATE TABLE IF NOT EXISTS outcomes "
+            "(key BLOB PRIMARY KEY, outcome TEXT NOT NULL) WITHOUT ROWID"
+        )
+    return store
+
+
+def _load_outcome(text: str) -> Outcome:
+    winner, turns, survivors, timed_out = json.loads(text)
+    return (
+        winner,
+        turns,
+        tuple(tuple(tuple(survivor) for survivor in team) for team in survivors),
+        timed_out,
+    )
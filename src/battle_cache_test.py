@@ -0,0 +1,114 @@
+import itertools
+import os
+import tempfile
+import unittest
+
+from batch_runner import build_team, run_battle, run_battles
+from batch_runner_test import make_pack
+from battle_cache import BattleCache, battle_key, stat_pair_first_id
+from snapshot import encode_team
+from team import Team
+
+
+def snapshot_team(pack, names, first_id):
+    """A team snapshot of the pack's bois with the given names"""
+    builders = {builder.boi.type_name: builder for builder in pack.boi_builders}
+    ids = itertools.count(first_id)
+    return encode_team(Team([builders[name].build(ids) for name in names]), pack)
+
+
+def summary(result):
+    return (result.winner, result.turns, result.survivors, result.timed_out)
+
+
+class BattleCacheTest(unittest.TestCase):
+    """Test cases for caching battle outcomes"""
+
+    def test_keys_are_canonical(self):
+        """Test that keys only change with what can change a battle"""
+        pack = make_pack()
+        team = snapshot_team(pack, ["Ant", "Dodo"], 0)
+        other = snapshot_team(pack, ["Ant", "Dodo"], 1000)
+        key = battle_key((team, other), 100, pack=pack)
+        # The same bois with ids in the same order
+        renumbered = (
+            snapshot_team(pack, ["Ant", "Dodo"], 5),
+            snapshot_team(pack, ["Ant", "Dodo"], 50),
+        )
+        self.assertEqual(battle_key(renumbered, 100, pack=pack), key)
+        # Team 1's bois built first, so they win ties
+        self.assertNotEqual(battle_key((other, team), 100, pack=pack), key)
+        reordered = snapshot_team(pack, ["Dodo", "Ant"], 0)
+        self.assertNotEqual(battle_key((reordered, other), 100, pack=pack), key)
+        self.assertNotEqual(battle_key((team, other), 100, seed=1, pack=pack), key)
+        self.assertNotEqual(battle_key((team, other), 99, pack=pack), key)
+        self.assertNotEqual(
+            battle_key(([(2, 3)], [(1, 1)]), 100), battle_key(([(2, 3)], [(1, 2)]), 100)
+        )
+
+    def test_lru_counters(self):
+        """Test that repeats are hits, and the least recently used goes first"""
+        pack = make_pack()
+        snapshots = (
+            snapshot_team(pack, ["Dodo", "Ant"], 0),
+            snapshot_team(pack, ["Ant", "Ant", "Ant"], 10),
+        )
+        matchups = [([(1, 2)], [(2, 1)]), ([(3, 3)], [(3, 3)]), snapshots]
+        cache = BattleCache(max_size=2)
+        for index, matchup in enumerate(matchups * 2):
+            result = run_battle(index, matchup, pack, seed=1, cache=cache)
+            self.assertEqual(result.index, index)
+            self.assertEqual(
+                summary(result), summary(run_battle(index, matchup, pack, seed=1))
+            )
+        # Each lookup misses, as the one it needs was just evicted
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (0, 6, 4))
+
+        for matchup in (matchups[2], matchups[1], matchups[2]):
+            run_battle(0, matchup, pack, seed=1, cache=cache)
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (3, 6, 4))
+        self.assertEqual(len(cache), 2)
+
+    def test_unseeded_battles_with_triggers_are_not_cached(self):
+        """Test that only battles that can't go another way are cached unseeded"""
+        pack = make_pack()
+        triggers = snapshot_team(pack, ["Dodo", "Ant"], 0)
+        cache = BattleCache()
+        for _ in range(2):
+            run_battle(0, (triggers, [(1, 1)]), pack, cache=cache)
+            run_battle(0, ([(2, 2)], [(1, 1)]), pack, cache=cache)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 1, 1))
+
+    def test_stat_pair_bois_are_built_after_snapshot_bois(self):
+        """Test that keys and battles order stat pair bois the same way"""
+        pack = make_pack()
+        matchup = (snapshot_team(pack, ["Ant", "Ant"], 5), [(1, 1), (1, 1)])
+        self.assertEqual(stat_pair_first_id(matchup), 7)
+        team = build_team(matchup[1], ids=itertools.count(stat_pair_first_id(matchup)))
+        self.assertEqual([boi.id for boi in team.bois], [7, 8])
+        renumbered = (snapshot_team(pack, ["Ant", "Ant"], 500), matchup[1])
+        self.assertEqual(
+            battle_key(renumbered, 10, pack=pack), battle_key(matchup, 10, pack=pack)
+        )
+
+    def test_file_is_shared(self):
+        """Test that outcomes stored by other processes are found on disk"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "outcomes.db")
+            matchups = [([(1, 5), (2, 2)], [(3, 1), (1, 1)]), ([(0, 1)], [(0, 1)])]
+            expected = [
+                summary(result)
+                for result in run_battles(
+                    matchups, workers=2, max_turns=20, cache=BattleCache(10, path)
+                )
+            ]
+            cache = BattleCache(10, path)
+            results = list(run_battles(matchups, workers=1, max_turns=20, cache=cache))
+            self.assertEqual([summary(result) for result in results], expected)
+            self.assertEqual((cache.hits, cache.disk_hits, cache.misses), (2, 2, 0))
+            self.assertTrue(results[1].timed_out)
+            cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,7 +5,8 @@ Demo script for battle system implementing Super Auto Pets characters.
 from boi import BoiBuilder
 from team import Team
 from battle_system import BattleSystem
-from system import Event
+from system import observes
+from events import DamageEvent
 
 
 def ant_faint_callback(boi, system, event):
@@ -31,7 +32,7 @@ def cricket_faint_callback(boi, system, event):
             .set_type_name("Zombie Cricket")
             .set_attack(1)
             .set_health(1)
-            .build()
+            .build(system.boi_ids)
         )
 
         # Add the zombie to the same team
@@ -59,14 +60,7 @@ def mosquito_start_battle_callback(boi, system, event):
         # Target the first enemy
         target = enemy_team.bois[0]
         # Deal 1 damage
-        system.send_event(
-            Event(
-                type="damage",
-                target=target,
-                source=boi,
-                damage=1,
-            )
-        )
+        system.send_event(DamageEvent(target=target, source=boi, damage=1))
         print(f"{boi.type_name} dealt 1 damage to {target.type_name}")
 
 
@@ -85,17 +79,17 @@ def dodo_start_turn_callback(boi, system, event):
             print(f"{boi.type_name} gave +{bonus} attack to {target.type_name}")
 
 
+@observes(
+    "attack", "damage", "death", "battle_start", "battle_turn_start", "battle_turn_end"
+)
 def print_event(event):
     """Print event information for debugging."""
     if event.type == "attack":
-        if "target" in event.data:
-            print(f"{event.data['target']} is attacking")
+        print(f"{event.target} is attacking")
     elif event.type == "damage":
-        if "target" in event.data and "damage" in event.data:
-            print(f"{event.data['target']} took {event.data['damage']} damage")
+        print(f"{event.target} took {event.damage} damage")
     elif event.type == "death":
-        if "target" in event.data:
-            print(f"{event.data['target']} has fainted")
+        print(f"{event.target} has fainted")
     elif event.type == "battle_start":
         print("Battle is starting!")
     elif event.type == "battle_turn_start":
@@ -2,11 +2,25 @@
 Module for the BattleSystem class.
 """
 
-from typing import List, Optional, Callable
+from typing import Any, Dict, List, Optional, Callable, Type
+import copy
+import itertools
+import random
+import sys
 
-from boi import Boi
+from boi import Boi, DEFAULT_BOI_IDS
+from event_order import EventOrderIndex
 from team_system import TeamSystem, Team
-from system import Event
+from system import Event, EventBudgetExceededError, TypedEvent
+from event_queue import EventQueue, copy_queue
+from resolver import resolve_vanilla
+from events import (
+    AttackEvent,
+    BattleStartEvent,
+    DamageEvent,
+    TurnEndEvent,
+    TurnStartEvent,
+)
 
 
 class BattleSystem(TeamSystem):
@@ -16,13 +30,45 @@ class BattleSystem(TeamSystem):
     """
 
     def __init__(
-        self, team0: Team, team1: Team, event_callbacks: List[Callable] | None = None
+        self,
+        team0: Team,
+        team1: Team,
+        event_callbacks: List[Callable] | None = None,
+        draw_on_runaway: bool = False,
+        event_queue: Optional[EventQueue] = None,
+        skip_unheard_events: bool = True,
+        use_resolver: bool = True,
+        seed: Optional[int] = None,
+        boi_id_seed: Optional[int] = None,
     ) -> None:
+        """
+        If draw_on_runaway is set, a battle whose triggers go over the event
+        budget ends as a draw instead of raising EventBudgetExceededError.
+        Unless skip_unheard_events is unset, battle start, turn start and turn
+        end events are only sent to bois that react to them, or to every boi
+        if an observer does.
+        Unless use_resolver is unset, run_to_end works out battles between
+        vanilla bois arithmetically, see resolver.
+        Triggers that need randomness should draw from rng, which is seeded
+        with seed, so that a battle can be replayed. Likewise, bois summoned
+        in battle should be built with boi_ids, which count up from
+        boi_id_seed, see TeamSystem.
+        """
         if event_callbacks is None:
             event_callbacks = []
-        super().__init__([team0, team1], event_callbacks)
+        super().__init__([team0, team1], event_callbacks, event_queue, boi_id_seed)
         self.battle_over = False
         self.winner: Optional[int] = None
+        # How many turns have been run
+        self.turn = 0
+        self.use_resolver = use_resolver
+        self.rng = random.Random(seed)
+        # The turn after which run_to_end resolved the battle, if it did
+        self.resolved_at: Optional[int] = None
+        self.draw_on_runaway = draw_on_runaway
+        self.runaway: Optional[EventBudgetExceededError] = None
+        self.skip_unheard_events = skip_unheard_events
+        self._event_order = EventOrderIndex(self.teams)
         self._start_battle()
 
     def is_battle_over(self) -> bool:
@@ -45,39 +91,153 @@ class BattleSystem(TeamSystem):
         """
         if self.battle_over:
             raise RuntimeError("Battle is already over.")
+        self.turn += 1
 
         # Process turn start events
-        for boi in self._all_bois_in_event_order():
-            self.send_event(Event(type="battle_turn_start", target=boi))
-        self._process_all_queue_events()
+        self._send_to_bois(TurnStartEvent)
+        if self.battle_over:
+            return
 
-        # Process attacks
-        attackers = sorted(
-            [self._first_boi(self.teams[0]), self._first_boi(self.teams[1])]
-        )
+        # Process attacks, in event order
+        attackers = [self._first_boi(self.teams[0]), self._first_boi(self.teams[1])]
+        if attackers[1] < attackers[0]:
+            attackers.reverse()
 
+        make_attack = self.event_factory(AttackEvent)
+        make_damage = self.event_factory(DamageEvent)
+        attack_events: List[Event] = []
         for boi in attackers:
             other_boi = self._first_boi(self.other_team(boi))
-            self.send_event(Event(type="attack", target=other_boi, source=boi))
-            self.send_event(
-                Event(
-                    type="damage",
-                    target=other_boi,
-                    source=boi,
-                    damage=boi.attack,
-                )
-            )
+            attack_events.append(make_attack(other_boi, boi))
+            attack_events.append(make_damage(other_boi, boi, boi.attack))
+        self.send_events(attack_events)
+        # Let the queue hold the only references, so pooled events can be reused
+        del attack_events
         self._process_all_queue_events()
+        if self.battle_over:
+            return
 
         # Process turn end events
-        for boi in self._all_bois_in_event_order():
-            self.send_event(Event(type="battle_turn_end", target=boi))
-
-        self._process_all_queue_events()
+        self._send_to_bois(TurnEndEvent)
+        if self.battle_over:
+            return
 
         # Check if battle is over
         self._check_battle_over()
 
+    def run_to_end(self, max_turns: Optional[int] = None) -> None:
+        """
+        Runs turns until the battle is over, or until turn reaches max_turns.
+        As soon as every remaining boi is vanilla and nothing observes the
+        battle, the rest of it is resolved without events, with the same
+        outcome, and resolved_at is set to the turn that happened after.
+        A resolved battle in which neither front boi can hurt the other can
+        never end, so with no max_turns it stops as soon as that happens.
+        """
+        while not self.battle_over and (max_turns is None or self.turn < max_turns):
+            # Bois with triggers may die or be replaced by vanilla bois on any
+            # turn, after which the rest of the battle can be resolved
+            if self._can_resolve():
+                self._resolve(max_turns)
+                return
+            self.run_turn()
+
+    def fork(self) -> "BattleSystem":
+        """
+        Returns an independent copy of the battle as it stands, e.g. to try
+        out what could happen next in a search. Bois, their effects, queued
+        events, the rng, the turn and the id counters are all copied, so the
+        fork plays out as the battle itself would.
+        Forked bois keep their ids and share their trigger and dispatch
+        tables with the originals until either's triggers change. The fork
+        has its own list of the same observers, and shares the event pool;
+        it has no profiler or tracer.
+        """
+        fork = copy.copy(self)
+        forked: Dict[int, Boi] = {}
+
+        def fork_boi(value: Any) -> Any:
+            if not isinstance(value, Boi):
+                return value
+            boi = forked.get(id(value))
+            if boi is None:
+                boi = forked[id(value)] = value.fork()
+            return boi
+
+        fork.teams = [Team([fork_boi(boi) for boi in team.bois]) for team in self.teams]
+        fork.event_queue = copy_queue(
+            self.event_queue, lambda event: event.copy(fork_boi)
+        )
+        # Both battles carry on numbering events and bois from the same point
+        next_event_id = next(self._event_ids)
+        self._event_ids = itertools.count(next_event_id)
+        fork._event_ids = itertools.count(next_event_id)
+        if self.boi_ids is not DEFAULT_BOI_IDS:
+            next_boi_id = next(self.boi_ids)
+            self.boi_ids = itertools.count(next_boi_id)
+            fork.boi_ids = itertools.count(next_boi_id)
+        fork.rng = random.Random()
+        fork.rng.setstate(self.rng.getstate())
+        fork._observer_index = {}
+        fork._callback_codes = dict(self._callback_codes)
+        fork.event_callbacks = list(self.event_callbacks)
+        fork.profiler = None
+        fork.tracer = None
+        fork._event_order = EventOrderIndex(fork.teams)
+        return fork
+
+    def _can_resolve(self) -> bool:
+        """
+        Check if the rest of the battle can be left to resolve_vanilla.
+        """
+        return (
+            self.use_resolver
+            and not self.event_callbacks
+            and self.tracer is None
+            and self.profiler is None
+            and not self.event_queue
+            and all(boi.is_vanilla() for team in self.teams for boi in team.bois)
+        )
+
+    def _resolve(self, max_turns: Optional[int]) -> None:
+        """
+        Plays the rest of the battle out with resolve_vanilla, and updates the
+        bois and teams to match.
+        """
+        self.resolved_at = self.turn
+        team0, team1 = self.teams
+        outcome = resolve_vanilla(
+            [(boi.attack, boi.health) for boi in team0.bois],
+            [(boi.attack, boi.health) for boi in team1.bois],
+            max_turns,
+            self.turn,
+        )
+        self.turn = outcome.turns
+        for team, healths, dead in zip(self.teams, outcome.healths, outcome.dead):
+            bois = list(team.bois)
+            for boi, health in zip(bois, healths):
+                if boi.health != health:
+                    boi.health = health
+            for boi in bois[:dead]:
+                self._remove_boi(boi)
+        self._check_battle_over()
+
+    def _process_all_queue_events(self, processed: int = 0) -> None:
+        """
+        Processes queued events, ending the battle as a draw if they run away
+        and draw_on_runaway is set.
+        """
+        try:
+            super()._process_all_queue_events(processed)
+        except EventBudgetExceededError as error:
+            if not self.draw_on_runaway:
+                raise
+            self.event_queue.clear()
+            self.runaway = error
+            self.battle_over = True
+            self.winner = None
+            self._event_order.detach()
+
     def _check_battle_over(self) -> None:
         if len(self.teams[0].bois) == 0 and len(self.teams[1].bois) == 0:
             self.battle_over = True
@@ -88,14 +248,19 @@ class BattleSystem(TeamSystem):
         elif len(self.teams[1].bois) == 0:
             self.battle_over = True
             self.winner = 0
+        if self.battle_over:
+            # Surviving bois no longer need to report stat changes
+            self._event_order.detach()
 
     def _start_battle(self) -> None:
         """
-        Runs battle start events.
+        Runs battle start events, which may already end the battle, e.g. if
+        they kill off a team, or a team starts out empty. Then the battle is
+        over before turn 1, rather than failing to find a boi to attack with.
         """
-        for boi in self._all_bois_in_event_order():
-            self.send_event(Event(type="battle_start", target=boi))
-        self._process_all_queue_events()
+        self._send_to_bois(BattleStartEvent)
+        if not self.battle_over:
+            self._check_battle_over()
 
     def _first_boi(self, team: Team) -> Boi:
         """
@@ -105,8 +270,50 @@ class BattleSystem(TeamSystem):
             raise ValueError("No bois in this team.")
         return team.bois[0]
 
+    def _send_to_bois(self, event_class: Type[TypedEvent]) -> None:
+        """
+        Sends an event of the given class to each boi, in event order, and
+        executes them. Bois the event would have no effect on are left out.
+        """
+        code = event_class.code
+        bois = self._all_bois_in_event_order()
+        make_event = self.event_factory(event_class)
+        if not self._skips_unheard(code):
+            self.send_and_execute_events(map(make_event, bois))
+            return
+        # With nothing queued, each boi's event would be processed in turn,
+        # before anything the triggers send. So whether a boi reacts is checked
+        # when its event would come up, as earlier triggers may have changed it.
+        # The events count towards the budget of the drain that follows them,
+        # and are recycled like drained events.
+        next_id = self._event_ids.__next__
+        pool = self.event_pool
+        getrefcount = sys.getrefcount
+        processed = 0
+        for boi in bois:
+            if boi.reacts_to(code):
+                event = make_event(boi)
+                event.id = next_id()
+                self._process_queue_event(event)
+                processed += 1
+                if pool is not None:
+                    refcount = getrefcount(event)
+                    pool.release(event, refcount)
+                    # The pool may hand the event out again, which must not
+                    # look referenced from here
+                    event = None  # type: ignore[assignment]
+        self._process_all_queue_events(processed)
+
     def _all_bois_in_event_order(self) -> List[Boi]:
         """
         Returns all bois in order.
         """
-        return sorted(self.teams[0].bois + self.teams[1].bois)
+        return self._event_order.bois()
+
+    def replace_boi(self, boi: Boi, with_boi: Boi) -> None:
+        super().replace_boi(boi, with_boi)
+        self._event_order.replace(boi, with_boi)
+
+    def _remove_boi(self, boi: Boi):
+        super()._remove_boi(boi)
+        self._event_order.remove(boi)
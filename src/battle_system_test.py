@@ -0,0 +1,216 @@
+import contextlib
+import io
+import unittest
+
+from battle_system import BattleSystem
+from boi import BoiBuilder
+from effect import EffectBuilder
+from system import EventBudgetExceededError
+from events import DamageEvent, TurnStartEvent
+from team import Team
+import battle_demo
+
+
+def make_team(*stats):
+    """Build a team of plain bois with the given (attack, health) stats"""
+    return Team(
+        [
+            BoiBuilder()
+            .set_type_name(f"Boi {i}")
+            .set_attack(attack)
+            .set_health(health)
+            .build()
+            for i, (attack, health) in enumerate(stats)
+        ]
+    )
+
+
+class BattleSystemTest(unittest.TestCase):
+    """Test cases for the BattleSystem"""
+
+    def test_event_order_follows_stat_changes(self):
+        """Test that the kept event order matches sorting after changes"""
+        battle = BattleSystem(make_team((1, 5), (3, 3)), make_team((2, 2), (3, 3)))
+        bois = battle.teams[0].bois + battle.teams[1].bois
+        self.assertEqual(battle._all_bois_in_event_order(), sorted(bois))
+
+        bois[0].attack = 10
+        bois[3].health = 1
+        self.assertEqual(battle._all_bois_in_event_order(), sorted(bois))
+        self.assertIs(battle._all_bois_in_event_order()[0], bois[0])
+
+        battle._remove_boi(bois[0])
+        self.assertEqual(battle._all_bois_in_event_order(), sorted(bois[1:]))
+        self.assertIsNone(bois[0]._order_index)
+
+    def test_bois_in_two_battles_update_both_orders(self):
+        """Test that stat changes reach every battle a boi is in"""
+        team = make_team((1, 5), (3, 3))
+        first = BattleSystem(team, make_team((2, 2)))
+        second = BattleSystem(team, make_team((4, 4)))
+        for battle in (first, second):
+            battle._all_bois_in_event_order()
+
+        team.bois[0].attack = 10
+        for battle in (first, second):
+            self.assertIs(battle._all_bois_in_event_order()[0], team.bois[0])
+
+        first._event_order.detach()
+        self.assertIs(team.bois[0]._order_index, second._event_order)
+        team.bois[1].attack = 20
+        self.assertIs(second._all_bois_in_event_order()[0], team.bois[1])
+
+    def test_battles_can_end_at_battle_start(self):
+        """Test that a battle whose start wipes out a team is over before turn 1"""
+
+        def wipe_out(boi, system, event):
+            for other in list(system.other_team(boi).bois):
+                system.send_event(DamageEvent(other, boi, other.health))
+
+        for use_resolver in (True, False):
+            team0 = make_team((1, 1))
+            team0.bois[0].add_trigger("battle_start", wipe_out)
+            battle = BattleSystem(
+                team0, make_team((1, 1), (2, 2)), use_resolver=use_resolver
+            )
+            self.assertTrue(battle.is_battle_over())
+            self.assertEqual((battle.get_winner(), battle.turn), (0, 0))
+            battle.run_to_end()
+            self.assertEqual(battle.turn, 0)
+            with self.assertRaises(RuntimeError):
+                battle.run_turn()
+
+    def test_skipping_unheard_events_keeps_results(self):
+        """Test that unheard turn events are skipped without changing battles"""
+
+        def run_demo_battle(skip_unheard_events):
+            team0 = Team(
+                [
+                    battle_demo.create_ant(),
+                    battle_demo.create_cricket(),
+                    battle_demo.create_beaver(),
+                ]
+            )
+            team1 = Team([battle_demo.create_mosquito(), battle_demo.create_dodo()])
+            with contextlib.redirect_stdout(io.StringIO()):
+                battle = BattleSystem(
+                    team0, team1, skip_unheard_events=skip_unheard_events
+                )
+                while not battle.is_battle_over():
+                    battle.run_turn()
+            survivors = [
+                [(boi.type_name, boi.attack, boi.health) for boi in team.bois]
+                for team in battle.teams
+            ]
+            return battle.get_winner(), survivors, next(battle._event_ids)
+
+        winner, survivors, num_events = run_demo_battle(True)
+        self.assertEqual(run_demo_battle(False)[:2], (winner, survivors))
+        self.assertLess(num_events, run_demo_battle(False)[2])
+
+    def test_bois_given_reactions_mid_phase_still_hear_it(self):
+        """Test that a boi made to react to turn start during it gets the event"""
+
+        def run_first_turn(skip_unheard_events):
+            heard = []
+
+            def give_effect(boi, system, event):
+                effect = EffectBuilder().add_trigger(
+                    "battle_turn_start", lambda effect, system, event: heard.append(1)
+                )
+                system.teams[0].bois[-1].effect = effect.build()
+
+            team0 = make_team((5, 5), (1, 1))
+            team0.bois[0].add_trigger("battle_turn_start", give_effect)
+            battle = BattleSystem(
+                team0, make_team((1, 9)), skip_unheard_events=skip_unheard_events
+            )
+            battle.run_turn()
+            return heard
+
+        self.assertEqual(run_first_turn(True), [1])
+        self.assertEqual(run_first_turn(False), [1])
+
+    def test_skipped_turn_events_count_towards_the_budget(self):
+        """Test that turn events sent without queueing are budgeted and pooled"""
+
+        def run_runaway_turn(skip_unheard_events):
+            def start_again(boi, system, event):
+                system.send_event(system.event_factory(TurnStartEvent)(boi))
+
+            team0 = make_team((1, 1), (1, 1))
+            for boi in team0.bois:
+                boi.add_trigger("battle_turn_start", start_again)
+            battle = BattleSystem(
+                team0, make_team((1, 1)), skip_unheard_events=skip_unheard_events
+            )
+            battle.event_budget = 50
+            pool = battle.enable_event_pooling()
+            first_id = next(battle._event_ids) + 1
+            with self.assertRaises(EventBudgetExceededError):
+                battle.run_turn()
+            return next(battle._event_ids) - first_id, pool.recycled, pool.retained
+
+        self.assertEqual(run_runaway_turn(True), (50, 50, 0))
+        self.assertEqual(run_runaway_turn(False), (50, 50, 0))
+
+    def test_fork_plays_out_independently(self):
+        """Test that a fork of a battle ends the same way, without touching it"""
+        team0 = Team([battle_demo.create_ant(), battle_demo.create_cricket()])
+        team1 = Team([battle_demo.create_mosquito(), battle_demo.create_dodo()])
+
+        def state(battle):
+            return (
+                battle.get_winner(),
+                battle.turn,
+                [
+                    [(b.id, b.type_name, b.attack, b.health) for b in team.bois]
+                    for team in battle.teams
+                ],
+                next(battle._event_ids),
+                battle.rng.random(),
+            )
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            battle = BattleSystem(team0, team1, seed=7)
+            battle.run_turn()
+            front0, front1 = team0.bois[0], team1.bois[0]
+            battle.send_event(DamageEvent(front1, front0, 1))
+            fork = battle.fork()
+            forked_front0, forked_front1 = fork.teams[0].bois[0], fork.teams[1].bois[0]
+            queued = fork.event_queue[0]
+            self.assertIs(queued.target, forked_front1)
+            self.assertIs(queued.source, forked_front0)
+            self.assertIsNot(forked_front0, front0)
+            self.assertEqual(forked_front0.id, front0.id)
+            self.assertIs(forked_front0.triggers, front0.triggers)
+
+            forked_stats = [(boi.attack, boi.health) for boi in fork.teams[1].bois]
+            battle._process_all_queue_events()
+            battle.run_to_end()
+            self.assertTrue(battle.is_battle_over())
+            self.assertFalse(fork.is_battle_over())
+            self.assertEqual(
+                [(boi.attack, boi.health) for boi in fork.teams[1].bois], forked_stats
+            )
+            fork._process_all_queue_events()
+            fork.run_to_end()
+        self.assertEqual(state(fork), state(battle))
+
+    def test_summoned_bois_take_ids_from_the_battle(self):
+        """Test that bois summoned in a battle and its forks get the same ids"""
+        team0 = Team([battle_demo.create_cricket()])
+        with contextlib.redirect_stdout(io.StringIO()):
+            battle = BattleSystem(team0, make_team((9, 9)), boi_id_seed=100)
+            fork = battle.fork()
+            for system in (battle, fork):
+                system.run_turn()
+        zombies = [system.teams[0].bois[0] for system in (battle, fork)]
+        self.assertEqual(
+            [zombie.type_name for zombie in zombies], ["Zombie Cricket"] * 2
+        )
+        self.assertEqual([zombie.id for zombie in zombies], [100, 100])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,7 +11,7 @@ from typing import List, Dict, Optional, Tuple, Any, Callable
 from boi import BoiBuilder
 from team import Team
 from battle_system import BattleSystem
-from system import Event
+from system import Event, observes
 
 # Import UI components
 from ui_components import (
@@ -252,6 +252,14 @@ class BattleUI:
             )
             self.team2_boi_cards.append(card)
 
+    @observes(
+        "attack",
+        "damage",
+        "death",
+        "battle_start",
+        "battle_turn_start",
+        "battle_turn_end",
+    )
     def _handle_event(self, event: Event):
         """Handle battle events for visual feedback"""
         # Safety check to ensure UI components are initialized
@@ -259,28 +267,24 @@ class BattleUI:
             return
 
         if event.type == "attack":
-            if "target" in event.data and "source" in event.data:
-                attacker = event.data["source"]
-                target = event.data["target"]
-                self.info_panel.add_message(
-                    f"{attacker.type_name} attacks {target.type_name}!"
-                )
-                self._add_attack_animation(attacker, target)
+            attacker = event.source
+            target = event.target
+            self.info_panel.add_message(
+                f"{attacker.type_name} attacks {target.type_name}!"
+            )
+            self._add_attack_animation(attacker, target)
 
         elif event.type == "damage":
-            if "target" in event.data and "damage" in event.data:
-                target = event.data["target"]
-                damage = event.data["damage"]
-                self.info_panel.add_message(
-                    f"{target.type_name} takes {damage} damage!"
-                )
-                self._add_damage_animation(target)
+            target = event.target
+            self.info_panel.add_message(
+                f"{target.type_name} takes {event.damage} damage!"
+            )
+            self._add_damage_animation(target)
 
         elif event.type == "death":
-            if "target" in event.data:
-                target = event.data["target"]
-                self.info_panel.add_message(f"{target.type_name} has fainted!")
-                self._add_death_animation(target)
+            target = event.target
+            self.info_panel.add_message(f"{target.type_name} has fainted!")
+            self._add_death_animation(target)
 
         elif event.type == "battle_start":
             self.info_panel.add_message("Battle begins!")
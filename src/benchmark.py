@@ -0,0 +1,374 @@
+"""
+Micro-benchmarks for the headless battle engine.
+Run with `python benchmark.py [name ...]`; with no names, runs every benchmark.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from boi import BoiBuilder
+from effect import EffectBuilder
+from item import ItemBuilder
+from team import Team
+from battle_system import BattleSystem
+from system import Event, System
+from event_queue import EventQueue, PriorityEventQueue
+from event_pool import EventPool
+
+TEAM0_STATS = [(3, 5), (2, 4), (4, 3), (1, 6), (5, 2)]
+TEAM1_STATS = [(2, 6), (4, 4), (3, 3), (2, 5), (6, 1)]
+
+
+def make_team(stats: List[Tuple[int, int]]) -> Team:
+    """
+    Build a team of default-trigger bois with the given (attack, health) stats.
+    """
+    return Team(
+        [
+            BoiBuilder()
+            .set_type_name(f"Boi {i}")
+            .set_attack(attack)
+            .set_health(health)
+            .build()
+            for i, (attack, health) in enumerate(stats)
+        ]
+    )
+
+
+def bench_events(num_battles: int = 2000) -> Dict[str, float]:
+    """
+    Measures event throughput of full 5v5 battles.
+    Teams are built up front so only the battle itself is timed.
+    """
+    matchups = [
+        (make_team(TEAM0_STATS), make_team(TEAM1_STATS)) for _ in range(num_battles)
+    ]
+    num_events = 0
+
+    def count_event(_: Event) -> None:
+        nonlocal num_events
+        num_events += 1
+
+    start = time.perf_counter()
+    for team0, team1 in matchups:
+        battle = BattleSystem(team0, team1, [count_event])
+        while not battle.is_battle_over():
+            battle.run_turn()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "battles_per_sec": num_battles / elapsed,
+        "events_per_sec": num_events / elapsed,
+        "events_per_battle": num_events / num_battles,
+    }
+
+
+def _run_battles(
+    num_battles: int, make_queue: Callable[[], EventQueue | None]
+) -> float:
+    """
+    Runs 5v5 battles to completion and returns the time they took.
+    """
+    matchups = [
+        (make_team(TEAM0_STATS), make_team(TEAM1_STATS)) for _ in range(num_battles)
+    ]
+    start = time.perf_counter()
+    for team0, team1 in matchups:
+        battle = BattleSystem(team0, team1, event_queue=make_queue())
+        while not battle.is_battle_over():
+            battle.run_turn()
+    return time.perf_counter() - start
+
+
+class NullSystem(System):
+    """
+    A system whose events do nothing, to isolate queueing overhead.
+    """
+
+    def _process_queue_event(self, event: Event) -> None:
+        pass
+
+
+def bench_bulk_send(batch_size: int = 10, num_batches: int = 20000) -> Dict[str, float]:
+    """
+    Compares per-event overhead of send_event in a loop against send_events.
+    The batch size defaults to about one battle phase worth of events.
+    """
+    system = NullSystem()
+    batches = [
+        [Event(type="ping") for _ in range(batch_size)] for _ in range(num_batches)
+    ]
+    num_events = batch_size * num_batches
+
+    start = time.perf_counter()
+    for batch in batches:
+        for event in batch:
+            system.send_event(event)
+        system._process_all_queue_events()
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for batch in batches:
+        system.send_and_execute_events(batch)
+    bulk_time = time.perf_counter() - start
+
+    return {
+        "loop_ns_per_event": loop_time / num_events * 1e9,
+        "bulk_ns_per_event": bulk_time / num_events * 1e9,
+    }
+
+
+def bench_queues(num_events: int = 200000, num_battles: int = 2000) -> Dict[str, float]:
+    """
+    Compares the FIFO and priority queue backends, on raw queue throughput
+    (all events queued, then drained) and on full 5v5 battles.
+    """
+    events = [Event(type="ping") for _ in range(num_events)]
+    results = {}
+    backends: Dict[str, Callable[[], EventQueue | None]] = {
+        "fifo": lambda: None,
+        "priority": lambda: PriorityEventQueue(
+            phases={"battle_turn_start": 0, "attack": 1, "damage": 1}
+        ),
+    }
+    for name, make_queue in backends.items():
+        system = NullSystem(make_queue())
+        system.event_budget = None
+        start = time.perf_counter()
+        system.send_and_execute_events(events)
+        results[f"{name}_events_per_sec"] = num_events / (time.perf_counter() - start)
+        results[f"{name}_battles_per_sec"] = num_battles / _run_battles(
+            num_battles, make_queue
+        )
+    return results
+
+
+def bench_pooling(num_battles: int = 2000) -> Dict[str, float]:
+    """
+    Compares full 5v5 battles with and without event pooling, on speed, on
+    how many events each battle allocates and on garbage collections run.
+    """
+    results = {}
+    for name, pooled in (("unpooled", False), ("pooled", True)):
+        matchups = [
+            (make_team(TEAM0_STATS), make_team(TEAM1_STATS)) for _ in range(num_battles)
+        ]
+        # One pool for all battles, as a batch of simulations would use it
+        pool = EventPool()
+        allocated = 0
+        gc.collect()
+        collections = sum(stats["collections"] for stats in gc.get_stats())
+        start = time.perf_counter()
+        for team0, team1 in matchups:
+            battle = BattleSystem(team0, team1)
+            if pooled:
+                battle.enable_event_pooling(pool=pool)
+            while not battle.is_battle_over():
+                battle.run_turn()
+            if not pooled:
+                # Without a pool, every processed event was a fresh allocation
+                allocated += next(battle._event_ids)
+        elapsed = time.perf_counter() - start
+        results[f"{name}_battles_per_sec"] = num_battles / elapsed
+        results[f"{name}_events_allocated_per_battle"] = (
+            allocated + pool.allocated
+        ) / num_battles
+        results[f"{name}_gc_collections"] = (
+            sum(stats["collections"] for stats in gc.get_stats()) - collections
+        )
+    return results
+
+
+def bench_builds(num_builds: int = 100000) -> Dict[str, float]:
+    """
+    Measures how fast builders make bois, items and effects, as the shop
+    does on every roll. The boi builder has a default effect so cloning it
+    is included.
+    """
+    builder = (
+        BoiBuilder()
+        .set_type_name("Ant")
+        .set_attack(2)
+        .set_health(3)
+        .add_default_effect(EffectBuilder().set_name("Shield").build())
+    )
+    results = {}
+    item_builder = (
+        ItemBuilder()
+        .set_name("Apple")
+        .set_price(3)
+        .set_effect_builder(EffectBuilder().set_name("Apple Effect"))
+    )
+    for label, build in (
+        ("builds", builder.build),
+        ("item_builds", item_builder.build),
+        ("effect_builds", item_builder.template.effect_builder.build),
+    ):
+        start = time.perf_counter()
+        for _ in range(num_builds):
+            build()
+        results[f"{label}_per_sec"] = num_builds / (time.perf_counter() - start)
+    return results
+
+
+def bench_memory(num_teams: int = 20000) -> Dict[str, float]:
+    """
+    Measures the memory held by built 5-boi teams, as a ghost team archive
+    keeps them, and extrapolates to an archive of a million teams.
+    Bois come from shared builders, like the ones in a pack.
+    """
+    builders = [
+        BoiBuilder().set_type_name(f"Boi {i}").set_attack(attack).set_health(health)
+        for i, (attack, health) in enumerate(TEAM0_STATS)
+    ]
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        teams = [
+            Team([builder.build() for builder in builders]) for _ in range(num_teams)
+        ]
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    bytes_per_team = used / len(teams)
+    return {
+        "bytes_per_boi": bytes_per_team / len(TEAM0_STATS),
+        "bytes_per_team": bytes_per_team,
+        "mb_per_1m_team_archive": bytes_per_team * 1_000_000 / 2**20,
+    }
+
+
+def bench_unheard_events(num_battles: int = 2000) -> Dict[str, float]:
+    """
+    Compares 5v5 battles of default-trigger bois with and without skipping
+    turn events no boi or observer reacts to.
+    """
+    results = {}
+    for label, skip in (("all_events", False), ("skip_unheard", True)):
+        matchups = [
+            (make_team(TEAM0_STATS), make_team(TEAM1_STATS)) for _ in range(num_battles)
+        ]
+        start = time.perf_counter()
+        for team0, team1 in matchups:
+            battle = BattleSystem(team0, team1, skip_unheard_events=skip)
+            while not battle.is_battle_over():
+                battle.run_turn()
+        results[f"{label}_battles_per_sec"] = num_battles / (
+            time.perf_counter() - start
+        )
+    return results
+
+
+def bench_vanilla_batch(num_battles: int = 20000) -> Dict[str, float]:
+    """
+    Compares running random vanilla battles through BattleSystem, the
+    closed-form resolver and the NumPy batch engine.
+    """
+    # pylint: disable=import-outside-toplevel
+    from batch_runner import random_matchups, run_battle
+    from vector_engine import VanillaBatch
+
+    matchups = list(random_matchups(num_battles))
+    start = time.perf_counter()
+    for index, matchup in enumerate(matchups):
+        run_battle(index, matchup, use_resolver=False)
+    event_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for index, matchup in enumerate(matchups):
+        run_battle(index, matchup)
+    resolver_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    VanillaBatch(matchups).run()
+    vector_elapsed = time.perf_counter() - start
+    return {
+        "event_battles_per_sec": num_battles / event_elapsed,
+        "resolver_battles_per_sec": num_battles / resolver_elapsed,
+        "vector_battles_per_sec": num_battles / vector_elapsed,
+    }
+
+
+def bench_battle_cache(num_matchups: int = 200, repeats: int = 10) -> Dict[str, float]:
+    """
+    Compares battling the same matchups again and again through the event
+    engine, with and without a battle cache.
+    """
+    # pylint: disable=import-outside-toplevel
+    from batch_runner import random_matchups, run_battle
+    from battle_cache import BattleCache
+
+    matchups = list(random_matchups(num_matchups)) * repeats
+    results = {}
+    for label, cache in (("uncached", None), ("cached", BattleCache())):
+        start = time.perf_counter()
+        for index, matchup in enumerate(matchups):
+            run_battle(index, matchup, use_resolver=False, cache=cache)
+        results[f"{label}_battles_per_sec"] = len(matchups) / (
+            time.perf_counter() - start
+        )
+    return results
+
+
+def bench_fork(num_forks: int = 5000) -> Dict[str, float]:
+    """
+    Compares forking a 5v5 battle with trigger bois after its first turn
+    with BattleSystem.fork and with copy.deepcopy.
+    """
+    # pylint: disable=import-outside-toplevel
+    import contextlib
+    import copy
+
+    import battle_demo
+
+    makers = [
+        battle_demo.create_ant,
+        battle_demo.create_cricket,
+        battle_demo.create_beaver,
+        battle_demo.create_mosquito,
+        battle_demo.create_dodo,
+    ]
+    with contextlib.redirect_stdout(None):
+        battle = BattleSystem(
+            Team([make() for make in makers]), Team([make() for make in makers])
+        )
+        battle.run_turn()
+    results = {}
+    for label, fork in (("fork", BattleSystem.fork), ("deepcopy", copy.deepcopy)):
+        count = num_forks if label == "fork" else num_forks // 10
+        start = time.perf_counter()
+        for _ in range(count):
+            fork(battle)
+        results[f"{label}_per_sec"] = count / (time.perf_counter() - start)
+    return results
+
+
+BENCHMARKS: Dict[str, Callable[[], Dict[str, float]]] = {
+    "events": bench_events,
+    "bulk_send": bench_bulk_send,
+    "queues": bench_queues,
+    "pooling": bench_pooling,
+    "builds": bench_builds,
+    "memory": bench_memory,
+    "unheard_events": bench_unheard_events,
+    "vanilla_batch": bench_vanilla_batch,
+    "battle_cache": bench_battle_cache,
+    "fork": bench_fork,
+}
+
+
+def main(names: List[str]) -> None:
+    """Run the named benchmarks (or all of them) and print their results."""
+    for name in names or list(BENCHMARKS):
+        if name not in BENCHMARKS:
+            raise SystemExit(f"Unknown benchmark: {name}")
+        results = BENCHMARKS[name]()
+        print(f"{name}:")
+        for key, value in results.items():
+            print(f"  {key}: {value:,.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
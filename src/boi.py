@@ -3,56 +3,306 @@ This module defines the Boi class, which represents a Boi entity in the game.
 Also includes builder pattern for creating Boi instances.
 """
 
-from typing import Dict, Callable, List, Optional
+from types import MappingProxyType
+from typing import (
+    Any,
+    Dict,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Tuple,
+    TYPE_CHECKING,
+)
+import itertools
+import sys
 import uuid
-from copy import deepcopy
 
-from system import Event, System
-from effect import Effect
+from system import Event, System, TriggerTable, event_type_code
+from events import (
+    AttackEvent,
+    BattleStartEvent,
+    DamageEvent,
+    DeathEvent,
+    KilledEvent,
+    TurnEndEvent,
+    TurnStartEvent,
+)
+from effect import Effect, EffectCallback
+
+if TYPE_CHECKING:
+    from event_order import EventOrderIndex, SharedEventOrder
 
 BoiCallback = Callable[["Boi", System, Event], None]
+BoiTriggers = Mapping[int, Tuple[BoiCallback, ...]]
+# Per event type code, the Boi's callbacks and then its effect's callbacks
+Dispatch = Dict[int, Tuple[Tuple[BoiCallback, ...], Tuple[EffectCallback, ...]]]
 
 MAX_BOI_LEVEL = 3
 LEVEL_UP_EXPERIENCE = 3
 MAX_HEALTH = 50
 MAX_ATTACK = 50
 
+# Codes of the events a battle sends to bois, other than damage
+BATTLE_EVENT_CODES = frozenset(
+    event_class.code
+    for event_class in (
+        AttackEvent,
+        BattleStartEvent,
+        DeathEvent,
+        KilledEvent,
+        TurnEndEvent,
+        TurnStartEvent,
+    )
+)
+
+# Allocates ids for bois built without a system's own allocator
+DEFAULT_BOI_IDS: Iterator[int] = itertools.count()
+
+
+def _read_only_triggers(triggers: Mapping[Any, Iterable[BoiCallback]]) -> BoiTriggers:
+    return MappingProxyType(
+        TriggerTable({key: tuple(callbacks) for key, callbacks in triggers.items()})
+    )
+
+
+EMPTY_TRIGGERS: BoiTriggers = _read_only_triggers({})
+
 
 class Boi:
     """
     Represents a Boi entity in the game.
-    Each Boi has a unique ID and can be added to a team.
+    Each Boi has an integer id, unique among the bois from the same id
+    allocator, and can be added to a team. The id breaks ties in event order.
+    Its UUID is only generated when first asked for, e.g. for display.
+    Slotted, since archives of ghost teams hold millions of bois.
     """
 
+    __slots__ = (
+        "type_name",
+        "type_id",
+        "_attack",
+        "_health",
+        "_order_index",
+        "level",
+        "experience",
+        "_triggers",
+        "_effect",
+        "_dispatch",
+        "id",
+        "_uuid",
+    )
+
     def __init__(self) -> None:
         super().__init__()
+        # The EventOrderIndex to tell about stat changes, if any, or a
+        # SharedEventOrder if the Boi is in several
+        self._order_index: Optional["EventOrderIndex | SharedEventOrder"] = None
         self.type_name: str
-        self.attack: int
-        self.health: int
+        # Set by the Pack the Boi's builder is added to, see Pack.add_boi_builder
+        self.type_id: Optional[int] = None
+        self._attack: int
+        self._health: int
         self.level: int = 1
         self.experience: int = 0
-        self.triggers: Dict[str, List[BoiCallback]] = {}
-        self.effect: Optional[Effect] = None
-        self.uuid: str = str(uuid.uuid4())
+        # Callbacks keyed by event type code. Never changed, so clones can
+        # share it, see add_trigger
+        self._triggers: BoiTriggers = EMPTY_TRIGGERS
+        self._effect: Optional[Effect] = None
+        # Compiled from triggers and the effect's triggers, see trigger
+        self._dispatch: Optional[Dispatch] = None
+        self.id: int = next(DEFAULT_BOI_IDS)
+        self._uuid: Optional[str] = None
 
     def __repr__(self):
         return f"{self.type_name} ({self.attack}/{self.health})"
 
+    @property
+    def attack(self) -> int:
+        """
+        The Boi's attack. Changing it updates the Boi's event order index.
+        """
+        return self._attack
+
+    @attack.setter
+    def attack(self, attack: int) -> None:
+        self._attack = attack
+        if self._order_index is not None:
+            self._order_index.invalidate()
+
+    @property
+    def health(self) -> int:
+        """
+        The Boi's health. Changing it updates the Boi's event order index.
+        """
+        return self._health
+
+    @health.setter
+    def health(self, health: int) -> None:
+        self._health = health
+        if self._order_index is not None:
+            self._order_index.invalidate()
+
+    @property
+    def uuid(self) -> str:
+        """
+        A globally unique id for this Boi.
+        """
+        if self._uuid is None:
+            self._uuid = str(uuid.uuid4())
+        return self._uuid
+
+    @property
+    def triggers(self) -> BoiTriggers:
+        """
+        Callbacks keyed by event type code, which can also be looked up by
+        event type name, see TriggerTable. The table is read-only.
+        Change it with add_trigger, or by assigning a new table, so the
+        dispatch table is rebuilt.
+        """
+        return self._triggers
+
+    @triggers.setter
+    def triggers(self, triggers: Mapping[Any, Iterable[BoiCallback]]) -> None:
+        self._triggers = _read_only_triggers(triggers)
+        self._dispatch = None
+
+    @property
+    def effect(self) -> Optional[Effect]:
+        """
+        The Boi's effect, which gets every event after the Boi's own triggers.
+        """
+        return self._effect
+
+    @effect.setter
+    def effect(self, effect: Optional[Effect]) -> None:
+        previous = self._effect
+        if previous is not None and previous._holder is self:
+            previous._holder = None
+        self._effect = effect
+        if effect is not None:
+            effect._holder = self
+        self._dispatch = None
+
+    def invalidate_dispatch(self) -> None:
+        """
+        Makes the next event rebuild the dispatch table.
+        """
+        self._dispatch = None
+
+    def _compile_dispatch(self) -> Dispatch:
+        """
+        Builds the dispatch table from the Boi's and its effect's triggers.
+        Event types neither of them reacts to are left out.
+        """
+        effect_triggers = {} if self._effect is None else self._effect.triggers
+        dispatch: Dispatch = {}
+        for code in self._triggers.keys() | effect_triggers.keys():
+            callbacks = tuple(self._triggers.get(code, ()))
+            effect_callbacks = tuple(effect_triggers.get(code, ()))
+            if callbacks or effect_callbacks:
+                dispatch[code] = (callbacks, effect_callbacks)
+        self._dispatch = dispatch
+        return dispatch
+
+    def reacts_to(self, code: int) -> bool:
+        """
+        Returns True if the Boi or its effect has callbacks for the event type
+        with the given code.
+        """
+        dispatch = self._dispatch
+        if dispatch is None:
+            dispatch = self._compile_dispatch()
+        return code in dispatch
+
     def trigger(self, event: Event, system: System) -> None:
         """
         Trigger a type for this Boi.
+        Runs the Boi's callbacks for the event, then its effect's, with one
+        lookup in the compiled dispatch table.
+        """
+        dispatch = self._dispatch
+        if dispatch is None:
+            dispatch = self._compile_dispatch()
+        entry = dispatch.get(event.code)
+        if entry is None:
+            return
+        callbacks, effect_callbacks = entry
+        for callback in callbacks:
+            callback(self, system, event)
+        effect = self._effect
+        if self._dispatch is not dispatch:
+            # A callback changed the triggers or the effect, e.g. by using an
+            # item. The current effect still gets the event.
+            if effect is not None:
+                effect.trigger(event, system)
+            return
+        for callback in effect_callbacks:
+            callback(effect, system, event)
+
+    def add_trigger(self, event_type: str, callback: BoiCallback) -> None:
+        """
+        Add a trigger to this Boi only.
+        The Boi gets a new triggers table, so bois sharing the old one are
+        left alone.
+        """
+        triggers = dict(self._triggers)
+        code = event_type_code(event_type)
+        triggers[code] = triggers.get(code, ()) + (callback,)
+        self._triggers = _read_only_triggers(triggers)
+        self._dispatch = None
+
+    def clone(self, ids: Optional[Iterator[int]] = None) -> "Boi":
+        """
+        Returns a new Boi with the same stats, triggers and effect.
+        The read-only triggers table and the dispatch table are shared, and
+        the effect is cloned. The clone's id comes from
+        ids, or from DEFAULT_BOI_IDS if not given.
         """
-        if event.type in self.triggers:
-            for callback in self.triggers[event.type]:
-                callback(self, system, event)
-        if self.effect:
-            self.effect.trigger(event, system)
+        clone = Boi.__new__(Boi)
+        clone._order_index = None
+        clone.type_id = self.type_id
+        try:
+            clone.type_name = self.type_name
+            clone._attack = self._attack
+            clone._health = self._health
+        except AttributeError:
+            # A partially built prototype, copy whichever stats were set
+            for name in ("type_name", "_attack", "_health"):
+                if hasattr(self, name):
+                    setattr(clone, name, getattr(self, name))
+        clone.level = self.level
+        clone.experience = self.experience
+        clone._triggers = self._triggers
+        if self._effect is None:
+            clone._effect = None
+        else:
+            clone._effect = self._effect.clone()
+            clone._effect._holder = clone
+        # The triggers are the same, so the compiled table can be shared too
+        if self._dispatch is None:
+            self._compile_dispatch()
+        clone._dispatch = self._dispatch
+        clone.id = next(DEFAULT_BOI_IDS if ids is None else ids)
+        clone._uuid = None
+        return clone
+
+    def fork(self) -> "Boi":
+        """
+        Returns a clone of the Boi that keeps its id and UUID, e.g. for a
+        copy of a battle that should play out the same way.
+        """
+        fork = self.clone(iter((self.id,)))
+        fork._uuid = self._uuid
+        return fork
 
     def _sort_tuple(self) -> tuple:
         """
         Returns a tuple of the Boi's stats for sorting.
+        Ties go to the boi with the lower id, i.e. the one built first.
         """
-        return (self.attack, self.health, self.uuid)
+        return (self._attack, self._health, -self.id)
 
     def __lt__(self, other: "Boi") -> bool:
         """
@@ -60,6 +310,28 @@ class Boi:
         """
         return self._sort_tuple() > other._sort_tuple()
 
+    def is_vanilla(self) -> bool:
+        """
+        Check if the only battle event the Boi or its effect reacts to is
+        damage, with just standard_damage_callback. Battles between such bois
+        only depend on their stats, see resolver.
+        """
+        dispatch = self._dispatch
+        if dispatch is None:
+            dispatch = self._compile_dispatch()
+        if dispatch.get(DamageEvent.code) != ((standard_damage_callback,), ()):
+            return False
+        return BATTLE_EVENT_CODES.isdisjoint(dispatch)
+
+    def same_type(self, other: "Boi") -> bool:
+        """
+        Check if two bois are of the same type, e.g. so they can be merged.
+        Bois from a pack are compared by type id, others by type name.
+        """
+        if self.type_id is not None and other.type_id is not None:
+            return self.type_id == other.type_id
+        return self.type_name == other.type_name
+
     def is_dead(self) -> bool:
         """
         Check if the Boi is dead.
@@ -72,11 +344,11 @@ def standard_damage_callback(boi: Boi, system: System, event: Event) -> None:
     A standard damage callback for the Boi.
     Most bois should have this callback.
     """
-    boi.health -= event.data["damage"]
+    boi.health -= event.damage
     if boi.is_dead():
-        killer = event.data["source"]
-        system.send_event(Event(type="death", target=boi, source=killer))
-        system.send_event(Event(type="killed", target=killer, source=boi))
+        killer = event.source
+        system.send_event(system.event_factory(DeathEvent)(boi, killer))
+        system.send_event(system.event_factory(KilledEvent)(killer, boi))
 
 
 def standard_levelup_callback(boi: Boi, system: System, event: Event) -> None:
@@ -92,7 +364,7 @@ def standard_item_callback(boi: Boi, system: System, event: Event) -> None:
     A standard item callback for the Boi.
     Most bois should have this callback.
     """
-    boi.effect = event.data["item"].effect_builder.build()
+    boi.effect = event.item.effect_builder.build()
 
 
 class BoiBuilder:
@@ -109,8 +381,9 @@ class BoiBuilder:
     def set_type_name(self, type_name: str) -> "BoiBuilder":
         """
         Set the type name of the Boi.
+        The name is interned, so it is one string however it was made.
         """
-        self.boi.type_name = type_name
+        self.boi.type_name = sys.intern(type_name)
         return self
 
     def set_attack(self, attack: int) -> "BoiBuilder":
@@ -127,13 +400,18 @@ class BoiBuilder:
         self.boi.health = health
         return self
 
+    def set_type_id(self, type_id: int) -> "BoiBuilder":
+        """
+        Set the type id of the Boi. Done by the Pack the builder is added to.
+        """
+        self.boi.type_id = type_id
+        return self
+
     def add_trigger(self, event_type: str, callback: Callable) -> "BoiBuilder":
         """
         Add a trigger for the Boi.
         """
-        if event_type not in self.boi.triggers:
-            self.boi.triggers[event_type] = []
-        self.boi.triggers[event_type].append(callback)
+        self.boi.add_trigger(event_type, callback)
         return self
 
     def add_default_effect(self, effect: Effect) -> "BoiBuilder":
@@ -144,10 +422,9 @@ class BoiBuilder:
         self.boi.effect = effect
         return self
 
-    def build(self) -> Boi:
+    def build(self, ids: Optional[Iterator[int]] = None) -> Boi:
         """
         Build and return the Boi instance.
+        Its id comes from ids, e.g. a system's boi_ids, or DEFAULT_BOI_IDS.
         """
-        copied_boi = deepcopy(self.boi)
-        copied_boi.uuid = str(uuid.uuid4())
-        return copied_boi
+        return self.boi.clone(ids)
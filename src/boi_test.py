@@ -0,0 +1,207 @@
+import itertools
+import unittest
+
+from boi import BoiBuilder
+from effect import EffectBuilder
+from item import Item, ItemBuilder
+from pack import Pack
+from events import AttackEvent, DamageEvent, ItemUsedEvent
+from battle_system import BattleSystem
+from team import Team
+
+
+def noop_callback(*_):
+    """A trigger that does nothing"""
+
+
+class BoiBuilderTest(unittest.TestCase):
+    """Test cases for building bois from a builder's prototype"""
+
+    def setUp(self):
+        """Set up test environment before each test"""
+        self.builder = (
+            BoiBuilder()
+            .set_type_name("Ant")
+            .set_attack(2)
+            .set_health(3)
+            .add_default_effect(EffectBuilder().set_name("Shield").build())
+        )
+
+    def test_builds_are_independent_copies(self):
+        """Test that built bois share nothing mutable with each other"""
+        first = self.builder.build()
+        second = self.builder.build()
+
+        self.assertIsNot(first, second)
+        self.assertNotEqual(first.uuid, second.uuid)
+        self.assertIsNot(first.effect, second.effect)
+        self.assertNotEqual(first.effect.uuid, second.effect.uuid)
+        self.assertEqual(second.effect.type_name, "Shield")
+
+        battle = BattleSystem(Team([first]), Team([]))
+        battle.send_and_execute_event(DamageEvent(target=first, source=None, damage=1))
+        self.assertEqual(first.health, 2)
+        self.assertEqual(second.health, 3)
+
+    def test_triggers_are_copied_on_write(self):
+        """Test that adding a trigger to one boi leaves the others alone"""
+        first = self.builder.build()
+        second = self.builder.build()
+        self.assertIs(first.triggers, second.triggers)
+
+        first.add_trigger("damage", noop_callback)
+        self.assertIn(noop_callback, first.triggers[DamageEvent.code])
+        self.assertNotIn(noop_callback, second.triggers[DamageEvent.code])
+
+        # Changing the builder after a build doesn't reach built bois
+        self.builder.add_trigger("damage", noop_callback)
+        self.assertNotIn(noop_callback, second.triggers[DamageEvent.code])
+        self.assertIn(noop_callback, self.builder.build().triggers[DamageEvent.code])
+
+    def test_editing_triggers_leaves_other_bois_alone(self):
+        """Test that a built boi's triggers can't be changed under its siblings"""
+        first = self.builder.build()
+        second = self.builder.build()
+        with self.assertRaises(TypeError):
+            first.triggers["damage"] = (noop_callback,)
+        with self.assertRaises(AttributeError):
+            first.triggers["damage"].append(noop_callback)
+
+        calls = []
+        first.triggers = {
+            **first.triggers,
+            "attack": [lambda *_: calls.append("attack")],
+        }
+        self.assertTrue(first.reacts_to(AttackEvent.code))
+        self.assertFalse(second.reacts_to(AttackEvent.code))
+        self.assertFalse(self.builder.boi.reacts_to(AttackEvent.code))
+        battle = BattleSystem(Team([first, second]), Team([]))
+        battle.send_and_execute_event(AttackEvent(target=first, source=second))
+        battle.send_and_execute_event(AttackEvent(target=second, source=first))
+        self.assertEqual(calls, ["attack"])
+
+    def test_triggers_accept_type_names(self):
+        """Test that trigger tables can still be used with event type names"""
+        boi = self.builder.build()
+        self.assertIs(boi.triggers["damage"], boi.triggers[DamageEvent.code])
+
+        calls = []
+        boi.triggers = {"damage": [lambda *_: calls.append("boi")]}
+        boi.effect.triggers = {"damage": [lambda *_: calls.append("effect")]}
+        self.assertEqual(list(boi.triggers), [DamageEvent.code])
+        self.assertIn("damage", boi.effect.triggers)
+        self.assertEqual(len(boi.effect.triggers.get("damage")), 1)
+        battle = BattleSystem(Team([boi]), Team([]))
+        battle.send_and_execute_event(DamageEvent(target=boi, source=None, damage=1))
+        self.assertEqual(calls, ["boi", "effect"])
+
+    def test_bois_effects_and_items_are_slotted(self):
+        """Test that the compact classes keep their public attributes"""
+        boi = self.builder.build()
+        item = Item("Apple", 3, EffectBuilder().set_name("Apple Effect"))
+        for obj in (boi, boi.effect, item):
+            self.assertFalse(hasattr(obj, "__dict__"))
+            with self.assertRaises(AttributeError):
+                obj.unknown_attribute = 1
+        self.assertEqual(len(item.uuid), 36)
+        self.assertEqual(item.uuid, item.uuid)
+        self.assertEqual(len(boi.effect.uuid), 36)
+
+    def test_effects_and_items_share_templates(self):
+        """Test that builds share templates until one of them is changed"""
+        first = self.builder.build()
+        second = self.builder.build()
+        self.assertIs(first.effect.template, second.effect.template)
+        with self.assertRaises(TypeError):
+            first.effect.triggers[DamageEvent.code] = (noop_callback,)
+
+        first.effect.add_trigger("damage", noop_callback)
+        self.assertIn(noop_callback, first.effect.triggers[DamageEvent.code])
+        self.assertNotIn(DamageEvent.code, second.effect.triggers)
+        self.assertEqual(first.effect.type_name, "Shield")
+
+        item_builder = ItemBuilder().set_name("Apple").set_price(3)
+        apple = item_builder.build()
+        self.assertIs(apple.template, item_builder.build().template)
+        item_builder.set_price(2)
+        self.assertEqual((apple.name, apple.price), ("Apple", 3))
+        self.assertEqual(item_builder.build().price, 2)
+
+        # Items can still be changed one at a time
+        sale = item_builder.build()
+        sale.price = 1
+        sale.name = "Bruised Apple"
+        sale.effect_builder = EffectBuilder().set_name("Bruise")
+        self.assertEqual((sale.name, sale.price), ("Bruised Apple", 1))
+        self.assertEqual(sale.create_effect().type_name, "Bruise")
+        self.assertEqual(sale.type_id, apple.type_id)
+        self.assertEqual((apple.name, apple.price), ("Apple", 3))
+        self.assertEqual(item_builder.build().price, 2)
+
+    def test_pack_assigns_type_ids(self):
+        """Test that bois and items from a pack carry their builder's type id"""
+        pack = Pack("Test Pack", 1)
+        pack.add_boi_builder(BoiBuilder().set_type_name("Beaver"), 1)
+        pack.add_boi_builder(self.builder, 1)
+        apple_builder = ItemBuilder().set_name("Apple")
+        pack.add_item_builder(apple_builder, 1)
+
+        ant = self.builder.build()
+        self.assertEqual(ant.type_id, 1)
+        self.assertIs(pack.boi_builder(ant.type_id), self.builder)
+        self.assertEqual(apple_builder.build().type_id, 0)
+        self.assertIs(pack.item_builder(0), apple_builder)
+        with self.assertRaises(ValueError):
+            Pack("Other Pack", 1).add_boi_builder(self.builder, 1)
+
+        # Bois of the same type merge even if one of them was renamed
+        renamed = self.builder.build()
+        renamed.type_name = "Big Ant"
+        self.assertTrue(ant.same_type(renamed))
+        self.assertFalse(ant.same_type(pack.boi_builder(0).build()))
+
+    def test_ids_break_ties_and_uuids_are_lazy(self):
+        """Test that equal bois are ordered by id, and ids can be seeded"""
+        ids = itertools.count(100)
+        first = self.builder.build(ids)
+        second = self.builder.build(ids)
+        self.assertEqual((first.id, second.id), (100, 101))
+        self.assertEqual(sorted([second, first]), [first, second])
+        self.assertIsNone(first._uuid)
+        self.assertEqual(len(first.uuid), 36)
+        self.assertEqual(first.uuid, first.uuid)
+
+    def test_dispatch_follows_trigger_and_effect_changes(self):
+        """Test that the compiled dispatch table is rebuilt when it goes stale"""
+        calls = []
+        boi = self.builder.build()
+        battle = BattleSystem(Team([boi]), Team([]))
+        battle.send_and_execute_event(DamageEvent(target=boi, source=None, damage=1))
+
+        boi.effect.add_trigger("damage", lambda *_: calls.append("effect"))
+        boi.add_trigger("damage", lambda *_: calls.append("boi"))
+        battle.send_and_execute_event(DamageEvent(target=boi, source=None, damage=1))
+        self.assertEqual(calls, ["boi", "effect"])
+
+        # Using an item swaps the effect, which then gets the same event
+        effect_builder = EffectBuilder().add_trigger(
+            "item_used", lambda *_: calls.append("item")
+        )
+        item = Item("Apple", 3, effect_builder)
+        battle.send_and_execute_event(ItemUsedEvent(target=boi, item=item))
+        self.assertEqual(calls[2:], ["item"])
+        battle.send_and_execute_event(DamageEvent(target=boi, source=None, damage=0))
+        self.assertEqual(calls[3:], ["boi"])
+
+        # Tables can't be changed in place behind the dispatch table's back
+        for triggers in (boi.triggers, boi.effect.triggers):
+            with self.assertRaises(TypeError):
+                triggers[AttackEvent.code] = (noop_callback,)
+        boi.triggers = {"attack": [lambda *_: calls.append("boi attack")]}
+        boi.effect.triggers = {"attack": [lambda *_: calls.append("effect attack")]}
+        battle.send_and_execute_event(AttackEvent(target=boi, source=boi))
+        self.assertEqual(calls[4:], ["boi attack", "effect attack"])
+
+
+if __name__ == "__main__":
+    unittest.main()
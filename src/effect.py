@@ -3,39 +3,142 @@ This module defines the Effect class, representing item and
 other persistent effects in the game.
 """
 
-from typing import Dict, Callable, List
+from types import MappingProxyType
+from typing import Any, Callable, List, Mapping, Optional, Tuple, TYPE_CHECKING
 import uuid
-from copy import deepcopy
 
-from system import Event, System
+from system import Event, System, TriggerTable, event_type_code
+
+if TYPE_CHECKING:
+    from boi import Boi
 
 EffectCallback = Callable[["Effect", System, Event], None]  # Assuming Boi is accessible
+EffectTriggers = Mapping[int, Tuple[EffectCallback, ...]]
+
+
+class EffectTemplate:
+    """
+    The name and triggers of an effect.
+    A template is never changed, so any number of effects can share one.
+    Changing an effect gives it a new template instead.
+    """
+
+    __slots__ = ("type_name", "triggers")
+
+    def __init__(
+        self,
+        type_name: str = "",
+        triggers: Optional[Mapping[Any, Tuple[EffectCallback, ...]]] = None,
+    ) -> None:
+        self.type_name = type_name
+        # Callbacks keyed by event type code, see TriggerTable
+        self.triggers: EffectTriggers = MappingProxyType(TriggerTable(triggers))
+
+    def with_name(self, type_name: str) -> "EffectTemplate":
+        """
+        Returns a copy of this template with another name.
+        """
+        return EffectTemplate(type_name, self.triggers)
+
+    def with_trigger(self, code: int, callback: EffectCallback) -> "EffectTemplate":
+        """
+        Returns a copy of this template with a callback added for the event
+        type with the given code.
+        """
+        triggers = dict(self.triggers)
+        triggers[code] = triggers.get(code, ()) + (callback,)
+        return EffectTemplate(self.type_name, triggers)
+
+
+EMPTY_EFFECT_TEMPLATE = EffectTemplate()
 
 
 class Effect:
     """
     Represents an effect, typically granted by an item.
     Effects have triggers similar to Bois.
+    Its name and triggers live in a template shared with the other effects
+    built from the same builder. The UUID is only generated when first asked for.
     """
 
-    def __init__(self) -> None:
+    __slots__ = ("template", "_uuid", "_holder")
+
+    def __init__(self, template: EffectTemplate = EMPTY_EFFECT_TEMPLATE) -> None:
         super().__init__()
-        self.type_name: str
-        self.uuid: str = str(uuid.uuid4())
-        self.triggers: Dict[str, List[EffectCallback]] = {}
+        self.template = template
+        self._uuid: Optional[str] = None
+        # The Boi whose dispatch table includes this effect's triggers, if any
+        self._holder: Optional["Boi"] = None
 
     def __repr__(self):
         return f"Effect({self.type_name})"
 
+    @property
+    def uuid(self) -> str:
+        """
+        A globally unique id for this effect.
+        """
+        if self._uuid is None:
+            self._uuid = str(uuid.uuid4())
+        return self._uuid
+
+    @property
+    def type_name(self) -> str:
+        """
+        The name of the effect.
+        """
+        return self.template.type_name
+
+    @type_name.setter
+    def type_name(self, type_name: str) -> None:
+        self.template = self.template.with_name(type_name)
+
+    @property
+    def triggers(self) -> EffectTriggers:
+        """
+        Callbacks keyed by event type code, which can also be looked up by
+        event type name, see TriggerTable. The table is read-only.
+        Change it with add_trigger, or by assigning a new table, so the
+        holding Boi's dispatch table is rebuilt.
+        """
+        return self.template.triggers
+
+    @triggers.setter
+    def triggers(self, triggers: Mapping[Any, List[EffectCallback]]) -> None:
+        self.template = EffectTemplate(
+            self.type_name,
+            {code: tuple(callbacks) for code, callbacks in triggers.items()},
+        )
+        if self._holder is not None:
+            self._holder.invalidate_dispatch()
+
     def trigger(self, event: Event, system: System) -> None:
         """
         Trigger callbacks associated with this effect for a given event type.
         The 'boi' parameter is the Boi instance holding the item/effect.
         """
-        if self.triggers and event.type in self.triggers:
-            for callback in self.triggers[event.type]:
+        callbacks = self.template.triggers.get(event.code)
+        if callbacks:
+            for callback in callbacks:
                 callback(self, system, event)
 
+    def add_trigger(self, event_type: str, callback: EffectCallback) -> None:
+        """
+        Add a trigger to this effect only.
+        Effects sharing the old template are left alone.
+        """
+        self.template = self.template.with_trigger(
+            event_type_code(event_type), callback
+        )
+        if self._holder is not None:
+            self._holder.invalidate_dispatch()
+
+    def clone(self) -> "Effect":
+        """
+        Returns a new Effect, with its own UUID, sharing this one's template.
+        """
+        return Effect(self.template)
+
 
 class EffectBuilder:
     """
@@ -56,17 +159,13 @@ class EffectBuilder:
         """
         Add a trigger for the Effect.
         """
-        if event_type not in self.effect.triggers:
-            self.effect.triggers[event_type] = []
-        self.effect.triggers[event_type].append(callback)
+        self.effect.add_trigger(event_type, callback)
         return self
 
     def build(self) -> Effect:
         """
         Build and return the Effect instance.
-        Creates a deep copy to ensure unique effects unless intended otherwise.
-        Assigns a new UUID.
+        Each build is a new effect with its own UUID, sharing the builder's
+        template, see Effect.clone.
         """
-        copied_effect = deepcopy(self.effect)
-        copied_effect.uuid = str(uuid.uuid4())
-        return copied_effect
+        return self.effect.clone()
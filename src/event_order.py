@@ -0,0 +1,124 @@
+"""
+Event order of the bois in a set of teams, kept sorted between changes.
+"""
+
+from typing import List
+
+from boi import Boi
+from team import Team
+
+
+class EventOrderIndex:
+    """
+    All bois of some teams in event order, i.e. sorted like sorted(bois).
+    Bois in the index report attack and health changes to it, so it is only
+    re-sorted after a stat changed or a boi was added. Reading an unchanged
+    index is O(n) and makes no comparisons.
+    Team changes made outside of remove and replace are picked up if they
+    change the number of bois; otherwise call invalidate.
+    A boi can be in several indexes at once, e.g. a team in two battles,
+    and then reports to all of them, see SharedEventOrder.
+    """
+
+    __slots__ = ("teams", "_bois", "_stale")
+
+    def __init__(self, teams: List[Team]) -> None:
+        self.teams = teams
+        self._bois: List[Boi] = []
+        self._stale = True
+
+    def invalidate(self) -> None:
+        """
+        Marks the order as out of date, e.g. because a boi's stats changed.
+        """
+        self._stale = True
+
+    def bois(self) -> List[Boi]:
+        """
+        Returns a new list of all bois in event order.
+        """
+        if self._stale or len(self._bois) != sum(len(team.bois) for team in self.teams):
+            self._sort()
+        return list(self._bois)
+
+    def remove(self, boi: Boi) -> None:
+        """
+        Removes a boi from the index. The others stay in order.
+        """
+        _release(boi, self)
+        if boi in self._bois:
+            self._bois.remove(boi)
+
+    def replace(self, boi: Boi, with_boi: Boi) -> None:
+        """
+        Replaces a boi with another one, which may belong elsewhere in order.
+        """
+        self.remove(boi)
+        self._stale = True
+
+    def detach(self) -> None:
+        """
+        Stops the indexed bois from reporting to this index.
+        """
+        for boi in self._bois:
+            _release(boi, self)
+        self._bois = []
+        self._stale = True
+
+    def _sort(self) -> None:
+        """
+        Re-sorts all bois and makes them report to this index.
+        """
+        bois = [boi for team in self.teams for boi in team.bois]
+        for boi in bois:
+            _claim(boi, self)
+        # Same order as sorted(bois), which compares with Boi.__lt__
+        bois.sort(key=Boi._sort_tuple, reverse=True)
+        self._bois = bois
+        self._stale = False
+
+
+class SharedEventOrder:
+    """
+    Stands in for the event order index of a boi that is in more than one,
+    and passes invalidations on to all of them.
+    """
+
+    __slots__ = ("indexes",)
+
+    def __init__(self, indexes: List[EventOrderIndex]) -> None:
+        self.indexes = indexes
+
+    def invalidate(self) -> None:
+        """
+        Marks the order of every index the boi is in as out of date.
+        """
+        for index in self.indexes:
+            index.invalidate()
+
+
+def _claim(boi: Boi, index: EventOrderIndex) -> None:
+    """
+    Makes a boi report its stat changes to index, as well as to any others.
+    """
+    owner = boi._order_index
+    if owner is None or owner is index:
+        boi._order_index = index
+    elif isinstance(owner, SharedEventOrder):
+        if index not in owner.indexes:
+            owner.indexes.append(index)
+    else:
+        boi._order_index = SharedEventOrder([owner, index])
+
+
+def _release(boi: Boi, index: EventOrderIndex) -> None:
+    """
+    Stops a boi from reporting its stat changes to index.
+    """
+    owner = boi._order_index
+    if owner is index:
+        boi._order_index = None
+    elif isinstance(owner, SharedEventOrder) and index in owner.indexes:
+        owner.indexes.remove(index)
+        if len(owner.indexes) == 1:
+            boi._order_index = owner.indexes[0]
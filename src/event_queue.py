@@ -0,0 +1,137 @@
+"""
+Event queue backends for systems.
+A plain deque is the default FIFO queue; PriorityEventQueue orders by phase.
+"""
+
+from collections import deque
+import itertools
+from heapq import heapify, heappop, heappush
+from typing import Callable, Dict, Iterable, List, Optional, Protocol, Tuple
+
+from system import Event, event_type_code
+
+
+class EventQueue(Protocol):
+    """
+    The queue operations a System relies on. collections.deque satisfies it.
+    """
+
+    def append(self, event: Event) -> None: ...
+
+    def extend(self, events: Iterable[Event]) -> None: ...
+
+    def popleft(self) -> Event: ...
+
+    def clear(self) -> None: ...
+
+    def __len__(self) -> int: ...
+
+
+class PriorityEventQueue:
+    """
+    Event queue ordered by (phase, priority, sequence), lowest first.
+    The phase comes from the event's type, the priority from an optional
+    function of the event, and the sequence number keeps events that tie on
+    both in the order they were sent. Ordering is therefore deterministic,
+    and each operation is O(log n) on a binary heap.
+    """
+
+    def __init__(
+        self,
+        phases: Optional[Dict[str, int]] = None,
+        priority: Optional[Callable[[Event], int]] = None,
+        default_phase: int = 0,
+    ) -> None:
+        """
+        phases maps event type names to phases; other types get default_phase.
+        """
+        self._heap: List[Tuple[int, int, int, Event]] = []
+        self._sequence = itertools.count()
+        self._phases: Dict[int, int] = {
+            event_type_code(type_name): phase
+            for type_name, phase in (phases or {}).items()
+        }
+        self._priority = priority
+        self.default_phase = default_phase
+
+    def _entry(self, event: Event) -> Tuple[int, int, int, Event]:
+        """
+        Returns the heap entry for an event.
+        """
+        priority = self._priority(event) if self._priority is not None else 0
+        return (
+            self._phases.get(event.code, self.default_phase),
+            priority,
+            next(self._sequence),
+            event,
+        )
+
+    def append(self, event: Event) -> None:
+        """
+        Adds an event to the queue.
+        """
+        heappush(self._heap, self._entry(event))
+
+    def extend(self, events: Iterable[Event]) -> None:
+        """
+        Adds several events to the queue, in order.
+        """
+        entries = [self._entry(event) for event in events]
+        if self._heap:
+            for entry in entries:
+                heappush(self._heap, entry)
+        else:
+            # Heapifying a whole batch is linear, unlike pushing one at a time
+            heapify(entries)
+            self._heap = entries
+
+    def popleft(self) -> Event:
+        """
+        Removes and returns the first event in (phase, priority, sequence) order.
+        """
+        if not self._heap:
+            raise IndexError("pop from an empty event queue")
+        return heappop(self._heap)[3]
+
+    def clear(self) -> None:
+        """
+        Removes all events from the queue.
+        """
+        self._heap.clear()
+
+    def copy(
+        self, copy_event: Callable[[Event], Event] = lambda event: event
+    ) -> "PriorityEventQueue":
+        """
+        Returns a queue with the same ordering, holding copy_event of each
+        event in this one, which come out in the same order.
+        """
+        copied = PriorityEventQueue.__new__(PriorityEventQueue)
+        copied._phases = self._phases
+        copied._priority = self._priority
+        copied.default_phase = self.default_phase
+        # Both queues carry on numbering events from the same point
+        sequence = next(self._sequence)
+        self._sequence = itertools.count(sequence)
+        copied._sequence = itertools.count(sequence)
+        # The heap stays valid, since entries never tie before their event
+        copied._heap = [
+            (phase, priority, number, copy_event(event))
+            for phase, priority, number, event in self._heap
+        ]
+        return copied
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def copy_queue(queue: EventQueue, copy_event: Callable[[Event], Event]) -> EventQueue:
+    """
+    Returns a copy of a deque or PriorityEventQueue, holding copy_event of
+    each of its events, in the same order.
+    """
+    if isinstance(queue, deque):
+        return deque(map(copy_event, queue))
+    if isinstance(queue, PriorityEventQueue):
+        return queue.copy(copy_event)
+    raise TypeError(f"Can't copy a {type(queue).__name__} event queue.")
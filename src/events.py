@@ -0,0 +1,246 @@
+"""
+Typed events used by the battle and shop systems.
+Each event type is a slotted subclass of TypedEvent with its own integer code.
+"""
+
+from typing import Any, TYPE_CHECKING
+
+from system import TypedEvent
+
+if TYPE_CHECKING:
+    from boi import Boi
+    from item import Item
+
+
+class BattleStartEvent(TypedEvent):
+    """Sent to every boi when a battle starts."""
+
+    __slots__ = ()
+    TYPE = "battle_start"
+    FIELDS = ("target",)
+
+    def __init__(self, target: "Boi") -> None:
+        super().__init__(target)
+
+
+class TurnStartEvent(TypedEvent):
+    """Sent to every boi at the start of a battle turn."""
+
+    __slots__ = ()
+    TYPE = "battle_turn_start"
+    FIELDS = ("target",)
+
+    def __init__(self, target: "Boi") -> None:
+        super().__init__(target)
+
+
+class TurnEndEvent(TypedEvent):
+    """Sent to every boi at the end of a battle turn."""
+
+    __slots__ = ()
+    TYPE = "battle_turn_end"
+    FIELDS = ("target",)
+
+    def __init__(self, target: "Boi") -> None:
+        super().__init__(target)
+
+
+class AttackEvent(TypedEvent):
+    """Sent to a boi when it is attacked by source."""
+
+    __slots__ = ()
+    TYPE = "attack"
+    FIELDS = ("target", "source")
+
+    def __init__(self, target: "Boi", source: "Boi") -> None:
+        super().__init__(target, source)
+
+
+class DamageEvent(TypedEvent):
+    """Sent to a boi when it takes damage from source."""
+
+    __slots__ = ("damage",)
+    TYPE = "damage"
+    FIELDS = ("target", "source", "damage")
+    PAYLOAD = "damage"
+
+    def __init__(self, target: "Boi", source: Any, damage: int) -> None:
+        super().__init__(target, source)
+        self.damage = damage
+
+
+class DeathEvent(TypedEvent):
+    """Sent to a boi when it dies. The source is the killer, if any."""
+
+    __slots__ = ()
+    TYPE = "death"
+    FIELDS = ("target", "source")
+
+    def __init__(self, target: "Boi", source: Any = None) -> None:
+        super().__init__(target, source)
+
+
+class KilledEvent(TypedEvent):
+    """Sent to a boi when it kills source."""
+
+    __slots__ = ()
+    TYPE = "killed"
+    FIELDS = ("target", "source")
+
+    def __init__(self, target: Any, source: "Boi") -> None:
+        super().__init__(target, source)
+
+
+class LevelUpEvent(TypedEvent):
+    """Sent to a boi when it levels up."""
+
+    __slots__ = ()
+    TYPE = "levelup"
+    FIELDS = ("target",)
+
+    def __init__(self, target: "Boi") -> None:
+        super().__init__(target)
+
+
+class ItemUsedEvent(TypedEvent):
+    """Sent to a boi when an item is used on it."""
+
+    __slots__ = ("item",)
+    TYPE = "item_used"
+    FIELDS = ("target", "item")
+
+    def __init__(self, target: "Boi", item: "Item") -> None:
+        super().__init__(target)
+        self.item = item
+
+
+class PurchasedEvent(TypedEvent):
+    """Sent to a boi when it is bought from the shop."""
+
+    __slots__ = ()
+    TYPE = "purchased"
+    FIELDS = ("target",)
+
+    def __init__(self, target: "Boi") -> None:
+        super().__init__(target)
+
+
+class SoldEvent(TypedEvent):
+    """Sent to a boi when it is sold."""
+
+    __slots__ = ()
+    TYPE = "sold"
+    FIELDS = ("target",)
+
+    def __init__(self, target: "Boi") -> None:
+        super().__init__(target)
+
+
+class RollEvent(TypedEvent):
+    """Requests a paid shop roll."""
+
+    __slots__ = ()
+    TYPE = "roll"
+    FIELDS = ()
+
+    def __init__(self) -> None:
+        super().__init__()
+
+
+class BuyItemEvent(TypedEvent):
+    """Requests buying item from the shop and using it on target_boi."""
+
+    __slots__ = ("item", "target_boi")
+    TYPE = "buy_item"
+    FIELDS = ("item", "target_boi")
+
+    def __init__(self, item: "Item", target_boi: "Boi") -> None:
+        super().__init__()
+        self.item = item
+        self.target_boi = target_boi
+
+
+class BuyBoiEvent(TypedEvent):
+    """Requests buying boi from the shop."""
+
+    __slots__ = ("boi",)
+    TYPE = "buy_boi"
+    FIELDS = ("boi",)
+
+    def __init__(self, boi: "Boi") -> None:
+        super().__init__()
+        self.boi = boi
+
+
+class SellBoiEvent(TypedEvent):
+    """Requests selling boi from the team."""
+
+    __slots__ = ("boi",)
+    TYPE = "sell_boi"
+    FIELDS = ("boi",)
+
+    def __init__(self, boi: "Boi") -> None:
+        super().__init__()
+        self.boi = boi
+
+
+class MergeBoiEvent(TypedEvent):
+    """Requests merging source_boi into target_boi."""
+
+    __slots__ = ("target_boi", "source_boi")
+    TYPE = "merge_boi"
+    FIELDS = ("target_boi", "source_boi")
+
+    def __init__(self, target_boi: "Boi", source_boi: "Boi") -> None:
+        super().__init__()
+        self.target_boi = target_boi
+        self.source_boi = source_boi
+
+
+class BuyAndMergeBoiEvent(TypedEvent):
+    """Requests buying bought from the shop and merging it into target."""
+
+    __slots__ = ("bought",)
+    TYPE = "buy_and_merge_boi"
+    FIELDS = ("bought", "target")
+
+    def __init__(self, bought: "Boi", target: "Boi") -> None:
+        super().__init__(target)
+        self.bought = bought
+
+
+class SwapBoiEvent(TypedEvent):
+    """Requests swapping the team positions of boi1 and boi2."""
+
+    __slots__ = ("boi1", "boi2")
+    TYPE = "swap_boi"
+    FIELDS = ("boi1", "boi2")
+
+    def __init__(self, boi1: "Boi", boi2: "Boi") -> None:
+        super().__init__()
+        self.boi1 = boi1
+        self.boi2 = boi2
+
+
+class ToggleFreezeItemEvent(TypedEvent):
+    """Requests toggling whether a shop item is frozen."""
+
+    __slots__ = ("item",)
+    TYPE = "toggle_freeze_item"
+    FIELDS = ("item",)
+
+    def __init__(self, item: "Item") -> None:
+        super().__init__()
+        self.item = item
+
+
+class ToggleFreezeBoiEvent(TypedEvent):
+    """Requests toggling whether a shop boi is frozen."""
+
+    __slots__ = ("boi",)
+    TYPE = "toggle_freeze_boi"
+    FIELDS = ("boi",)
+
+    def __init__(self, boi: "Boi") -> None:
+        super().__init__()
+        self.boi = boi
@@ -1,26 +1,120 @@
+from typing import Any, Optional
+from uuid import uuid4
+import sys
+
 from effect import EffectBuilder
 
-from uuid import uuid4
-from copy import deepcopy
+
+class ItemTemplate:
+    """
+    The name, price and effect builder of an item, and its type id if its
+    builder was added to a pack.
+    A template is never changed, so any number of items can share one.
+    """
+
+    __slots__ = ("name", "price", "effect_builder", "type_id")
+
+    def __init__(
+        self,
+        name: str,
+        price: int,
+        effect_builder: EffectBuilder,
+        type_id: Optional[int] = None,
+    ) -> None:
+        self.name = name
+        self.price = price
+        self.effect_builder = effect_builder
+        self.type_id = type_id
+
+    def with_changes(self, **changes: Any) -> "ItemTemplate":
+        """
+        Returns a copy of this template with the given fields changed.
+        """
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return ItemTemplate(**fields)
 
 
 class Item:
     """
     Represents an item in the game.
     These can be bought in the shop.
+    Its name, price and effect builder live in a template shared with the
+    other items built from the same builder. Changing one of them gives the
+    item a new template instead.
+    The UUID is only generated when first asked for.
     """
 
+    __slots__ = ("template", "_uuid")
+
     def __init__(self, name: str, price: int, effect_builder: EffectBuilder):
-        self.name = name
-        self.price = price
-        self.effect_builder = effect_builder
-        self.uuid = str(uuid4())
+        self.template = ItemTemplate(name, price, effect_builder)
+        self._uuid: Optional[str] = None
+
+    @classmethod
+    def from_template(cls, template: ItemTemplate) -> "Item":
+        """
+        Returns a new item, with its own UUID, sharing the given template.
+        """
+        item = cls.__new__(cls)
+        item.template = template
+        item._uuid = None
+        return item
+
+    @property
+    def name(self) -> str:
+        """
+        The name of the item.
+        """
+        return self.template.name
+
+    @name.setter
+    def name(self, name: str) -> None:
+        self.template = self.template.with_changes(name=name)
+
+    @property
+    def price(self) -> int:
+        """
+        The price of the item.
+        """
+        return self.template.price
+
+    @price.setter
+    def price(self, price: int) -> None:
+        self.template = self.template.with_changes(price=price)
+
+    @property
+    def type_id(self) -> Optional[int]:
+        """
+        The item's type id within its pack, see Pack.add_item_builder.
+        """
+        return self.template.type_id
+
+    @property
+    def effect_builder(self) -> EffectBuilder:
+        """
+        Builds the effect the item gives when used.
+        """
+        return self.template.effect_builder
+
+    @effect_builder.setter
+    def effect_builder(self, effect_builder: EffectBuilder) -> None:
+        self.template = self.template.with_changes(effect_builder=effect_builder)
+
+    @property
+    def uuid(self) -> str:
+        """
+        A globally unique id for this item.
+        """
+        if self._uuid is None:
+            self._uuid = str(uuid4())
+        return self._uuid
 
     def create_effect(self):
         """
         Create an effect based on the item.
         """
-        return self.effect_builder.build()
+        return self.template.effect_builder.build()
 
 
 class ItemBuilder:
@@ -29,34 +123,40 @@ class ItemBuilder:
     """
 
     def __init__(self):
-        self.item = Item("", 0, EffectBuilder())
+        self.template = ItemTemplate("", 0, EffectBuilder())
 
     def set_name(self, name: str) -> "ItemBuilder":
         """
         Set the name of the item.
         """
-        self.item.name = name
+        self.template = self.template.with_changes(name=sys.intern(name))
         return self
 
     def set_price(self, price: int) -> "ItemBuilder":
         """
         Set the price of the item.
         """
-        self.item.price = price
+        self.template = self.template.with_changes(price=price)
         return self
 
     def set_effect_builder(self, effect_builder: EffectBuilder) -> "ItemBuilder":
         """
         Set the effect builder for the item.
         """
-        self.item.effect_builder = effect_builder
+        self.template = self.template.with_changes(effect_builder=effect_builder)
+        return self
+
+    def set_type_id(self, type_id: int) -> "ItemBuilder":
+        """
+        Set the type id of the item. Done by the Pack the builder is added to.
+        """
+        self.template = self.template.with_changes(type_id=type_id)
         return self
 
     def build(self) -> Item:
         """
         Build and return the Item instance.
-        Will be a new instance each time.
+        Will be a new instance each time, sharing the builder's template.
+        Items built before a change to the builder keep their old template.
         """
-        item = deepcopy(self.item)
-        item.uuid = str(uuid4())
-        return item
+        return Item.from_template(self.template)
@@ -2,20 +2,26 @@
 Module for Pack class.
 """
 
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from boi import BoiBuilder
 from item import ItemBuilder
 
+# The boi and item builders a shop rolls from, see Pack.shop_builders
+ShopBuilders = Tuple[Tuple[BoiBuilder, ...], Tuple[ItemBuilder, ...]]
+
 
 class TierInfo:
     """
     Represents information about a tier in the game.
+    The builders are tuples, since a Pack keeps shop lists built from them,
+    see Pack.shop_builders. Add builders with Pack.add_boi_builder and
+    Pack.add_item_builder.
     """
 
     def __init__(self) -> None:
-        self.boi_builders: List[BoiBuilder] = []
-        self.item_builders: List[ItemBuilder] = []
+        self.boi_builders: Tuple[BoiBuilder, ...] = ()
+        self.item_builders: Tuple[ItemBuilder, ...] = ()
         self.shop_num_bois: int = 0
         self.shop_num_items: int = 0
 
@@ -30,6 +36,13 @@ class Pack:
         self.name = name
         self.num_tiers = num_tiers
         self.tiers = [TierInfo() for _ in range(num_tiers)]
+        # Every builder added, of any tier, in the order they were added.
+        # A builder's position is the type id of what it builds.
+        self.boi_builders: List[BoiBuilder] = []
+        self.item_builders: List[ItemBuilder] = []
+        # Boi and item builders of each tier and the tiers below it,
+        # filled in lazily, see shop_builders
+        self._shop_builders: Dict[int, ShopBuilders] = {}
 
     def _validate_tier(self, tier: int) -> bool:
         """
@@ -40,18 +53,80 @@ class Pack:
     def add_boi_builder(self, boi_builder: BoiBuilder, tier: int) -> None:
         """
         Add a Boi to the pack.
+        The builder's bois get the next type id the first time it is added.
+        It can be added to more tiers of the same pack, but not to another
+        pack, since its bois only carry one type id.
         """
         if not self._validate_tier(tier):
             raise ValueError(f"Invalid tier: {tier}.")
-        self.tiers[tier - 1].boi_builders.append(boi_builder)
+        type_id = boi_builder.boi.type_id
+        if type_id is None:
+            boi_builder.set_type_id(len(self.boi_builders))
+            self.boi_builders.append(boi_builder)
+        elif not self._has(self.boi_builders, type_id, boi_builder):
+            raise ValueError("Boi builder already belongs to another pack.")
+        self.tiers[tier - 1].boi_builders += (boi_builder,)
+        self._shop_builders.clear()
 
     def add_item_builder(self, item_builder: ItemBuilder, tier: int) -> None:
         """
         Add an Item to the pack.
+        The builder's items get the next type id the first time it is added.
+        It can be added to more tiers of the same pack, but not to another
+        pack, since its items only carry one type id.
         """
         if not self._validate_tier(tier):
             raise ValueError(f"Invalid tier: {tier}.")
-        self.tiers[tier - 1].item_builders.append(item_builder)
+        type_id = item_builder.template.type_id
+        if type_id is None:
+            item_builder.set_type_id(len(self.item_builders))
+            self.item_builders.append(item_builder)
+        elif not self._has(self.item_builders, type_id, item_builder):
+            raise ValueError("Item builder already belongs to another pack.")
+        self.tiers[tier - 1].item_builders += (item_builder,)
+        self._shop_builders.clear()
+
+    @staticmethod
+    def _has(builders: Sequence[Any], type_id: int, builder: Any) -> bool:
+        """
+        Check if builder is the one in builders with the given type id.
+        """
+        return type_id < len(builders) and builders[type_id] is builder
+
+    def boi_builder(self, type_id: Optional[int]) -> BoiBuilder:
+        """
+        Returns the builder of bois with the given type id.
+        """
+        if type_id is None or not 0 <= type_id < len(self.boi_builders):
+            raise ValueError(f"No boi type {type_id} in pack {self.name}.")
+        return self.boi_builders[type_id]
+
+    def item_builder(self, type_id: Optional[int]) -> ItemBuilder:
+        """
+        Returns the builder of items with the given type id.
+        """
+        if type_id is None or not 0 <= type_id < len(self.item_builders):
+            raise ValueError(f"No item type {type_id} in pack {self.name}.")
+        return self.item_builders[type_id]
+
+    def shop_builders(self, tier: int) -> ShopBuilders:
+        """
+        Returns the boi and item builders a shop of the given tier rolls from.
+        That is those of the tier and every tier below it.
+        They are kept until a builder is added, with add_boi_builder or
+        add_item_builder, the only ways to change a tier's builders.
+        """
+        builders = self._shop_builders.get(tier)
+        if builders is None:
+            if not self._validate_tier(tier):
+                raise ValueError(f"Invalid tier: {tier}.")
+            tiers = self.tiers[:tier]
+            builders = (
+                tuple(builder for info in tiers for builder in info.boi_builders),
+                tuple(builder for info in tiers for builder in info.item_builders),
+            )
+            self._shop_builders[tier] = builders
+        return builders
 
     def set_shop_tier_num_bois(self, tier: int, num_bois: int) -> None:
         """
@@ -0,0 +1,73 @@
+import random
+import unittest
+
+from boi import BoiBuilder
+from events import RollEvent
+from item import ItemBuilder
+from pack import Pack
+from shop_system import ShopSystem
+from team import Team
+
+
+class PackTest(unittest.TestCase):
+    """Test cases for the Pack class"""
+
+    def setUp(self):
+        """Set up test environment before each test"""
+        self.pack = Pack("Test Pack", 2)
+        self.ant_builder = BoiBuilder().set_type_name("Ant")
+        self.apple_builder = ItemBuilder().set_name("Apple")
+
+    def test_builders_can_be_in_several_tiers_of_one_pack(self):
+        """Test that a builder keeps its type id across the tiers it is in"""
+        self.pack.add_boi_builder(BoiBuilder().set_type_name("Beaver"), 1)
+        for tier in (1, 2):
+            self.pack.add_boi_builder(self.ant_builder, tier)
+            self.pack.add_item_builder(self.apple_builder, tier)
+        self.assertEqual(self.ant_builder.build().type_id, 1)
+        self.assertEqual(self.apple_builder.build().type_id, 0)
+        self.assertEqual(len(self.pack.boi_builders), 2)
+        self.assertEqual(len(self.pack.item_builders), 1)
+        self.assertEqual(self.pack.tiers[1].boi_builders, (self.ant_builder,))
+        self.assertEqual(self.pack.tiers[1].item_builders, (self.apple_builder,))
+
+    def test_builders_belong_to_one_pack(self):
+        """Test that a builder can't be added to a second pack"""
+        self.pack.add_boi_builder(self.ant_builder, 1)
+        self.pack.add_item_builder(self.apple_builder, 1)
+        other = Pack("Other Pack", 1)
+        with self.assertRaises(ValueError):
+            other.add_boi_builder(self.ant_builder, 1)
+        with self.assertRaises(ValueError):
+            other.add_item_builder(self.apple_builder, 1)
+        self.assertEqual((other.boi_builders, other.item_builders), ([], []))
+        self.assertEqual(other.tiers[0].boi_builders, ())
+
+    def test_shop_offers_builders_added_after_a_roll(self):
+        """Test that adding builders refreshes the pack's per-tier shop lists"""
+        random.seed(0)
+        self.pack.add_boi_builder(BoiBuilder().set_type_name("Beaver"), 1)
+        self.pack.add_item_builder(self.apple_builder, 1)
+        self.pack.set_shop_tier_num_bois(2, 20)
+        self.pack.set_shop_tier_num_items(2, 20)
+        shop = ShopSystem(Team([]), self.pack, 2, 10, [])
+        self.assertEqual({boi.type_name for boi in shop.shop_bois}, {"Beaver"})
+
+        self.pack.add_boi_builder(self.ant_builder, 2)
+        self.pack.add_item_builder(ItemBuilder().set_name("Honey"), 2)
+        shop.send_and_execute_event(RollEvent())
+        self.assertEqual({boi.type_name for boi in shop.shop_bois}, {"Beaver", "Ant"})
+        self.assertEqual({item.name for item in shop.shop_items}, {"Apple", "Honey"})
+
+    def test_tier_builders_are_only_changed_by_the_pack(self):
+        """Test that shop lists can't go stale through the tiers"""
+        self.pack.add_boi_builder(self.ant_builder, 1)
+        self.assertEqual(self.pack.shop_builders(2), ((self.ant_builder,), ()))
+        with self.assertRaises(AttributeError):
+            self.pack.tiers[0].boi_builders.append(BoiBuilder())
+        with self.assertRaises(AttributeError):
+            self.pack.shop_builders(2)[0].append(BoiBuilder())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Per-event-type timing and count profiler for systems.
+Attach one with System.enable_profiling.
+"""
+
+import json
+from typing import Any, Dict
+
+from system import EVENT_TYPE_NAMES
+
+
+class EventTypeStats:
+    """
+    Accumulated statistics for one event type.
+    """
+
+    __slots__ = ("count", "total_time", "max_time", "peak_queue_depth")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.peak_queue_depth = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the statistics as a dict. Times are in seconds.
+        """
+        return {
+            "count": self.count,
+            "total_time": self.total_time,
+            "mean_time": self.total_time / self.count if self.count else 0.0,
+            "max_time": self.max_time,
+            "peak_queue_depth": self.peak_queue_depth,
+        }
+
+
+class EventProfiler:
+    """
+    Records how many events of each type a system processed and how long
+    their handlers took, along with the deepest the queue got.
+    Queue depth is measured when an event is dequeued, including the event.
+    """
+
+    def __init__(self) -> None:
+        self.stats: Dict[int, EventTypeStats] = {}
+        self.peak_queue_depth = 0
+
+    def record(self, code: int, elapsed: float, queue_depth: int) -> None:
+        """
+        Records one processed event of the given type code.
+        """
+        stats = self.stats.get(code)
+        if stats is None:
+            stats = self.stats[code] = EventTypeStats()
+        stats.count += 1
+        stats.total_time += elapsed
+        if elapsed > stats.max_time:
+            stats.max_time = elapsed
+        if queue_depth > stats.peak_queue_depth:
+            stats.peak_queue_depth = queue_depth
+            if queue_depth > self.peak_queue_depth:
+                self.peak_queue_depth = queue_depth
+
+    def reset(self) -> None:
+        """
+        Clears all recorded statistics.
+        """
+        self.stats.clear()
+        self.peak_queue_depth = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the recorded statistics keyed by event type name.
+        """
+        return {
+            "peak_queue_depth": self.peak_queue_depth,
+            "event_types": {
+                EVENT_TYPE_NAMES[code]: stats.to_dict()
+                for code, stats in sorted(
+                    self.stats.items(), key=lambda item: -item[1].total_time
+                )
+            },
+        }
+
+    def to_json(self, **kwargs) -> str:
+        """
+        Returns the recorded statistics as JSON.
+        Keyword arguments are passed on to json.dumps.
+        """
+        return json.dumps(self.to_dict(), **kwargs)
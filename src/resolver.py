@@ -0,0 +1,121 @@
+"""
+Closed-form resolver for vanilla battles, whose bois only have the default
+triggers (see Boi.is_vanilla). Such a battle only depends on each team's
+ordered (attack, health) list, so it can be worked out arithmetically,
+without bois, events or a queue.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+# A team of vanilla bois as (attack, health) pairs, front boi first
+VanillaTeam = Sequence[Tuple[int, int]]
+
+# Stands in for the turns a front boi that never dies lasts
+_NEVER = 1 << 62
+
+
+class VanillaOutcome:
+    """
+    The end state of a vanilla battle.
+    healths holds the final health of every boi of each team, in their
+    original order, and dead how many bois at the front of each team died.
+    Winner is None if the battle ran out of turns, in which case timed_out
+    is set.
+    """
+
+    __slots__ = ("winner", "turns", "attacks", "healths", "dead", "timed_out")
+
+    def __init__(
+        self,
+        winner: Optional[int],
+        turns: int,
+        attacks: Tuple[List[int], List[int]],
+        healths: Tuple[List[int], List[int]],
+        dead: Tuple[int, int],
+        timed_out: bool,
+    ) -> None:
+        self.winner = winner
+        self.turns = turns
+        self.attacks = attacks
+        self.healths = healths
+        self.dead = dead
+        self.timed_out = timed_out
+
+    def __repr__(self):
+        return f"VanillaOutcome(winner={self.winner}, turns={self.turns})"
+
+    def survivors(self, side: int) -> List[Tuple[int, int]]:
+        """
+        Returns the (attack, health) of each remaining boi of a team.
+        """
+        first = self.dead[side]
+        return list(zip(self.attacks[side][first:], self.healths[side][first:]))
+
+
+def resolve_vanilla(
+    team0: VanillaTeam,
+    team1: VanillaTeam,
+    max_turns: Optional[int] = None,
+    turns: int = 0,
+) -> VanillaOutcome:
+    """
+    Works out how BattleSystem would play a vanilla battle out, turn for
+    turn: each turn the front bois damage each other at the same time, and
+    those left with no health die. Team 1 wins when both teams run out on
+    the same turn, as in BattleSystem.
+
+    Rather than stepping through turns, each pair of front bois skips to
+    the turn one of them dies. If neither can hurt the other the battle
+    never ends, so it is cut off at max_turns, or straight away with no
+    limit. turns is how many turns were already played, e.g. by BattleSystem
+    before it handed the battle over, and counts towards max_turns.
+    """
+    if not team0 or not team1:
+        raise ValueError("Both teams need bois to battle.")
+    attacks = ([attack for attack, _ in team0], [attack for attack, _ in team1])
+    healths = ([health for _, health in team0], [health for _, health in team1])
+    healths0, healths1 = healths
+    size0, size1 = len(team0), len(team1)
+    attacks0, attacks1 = attacks
+    front0 = front1 = 0
+    winner: Optional[int] = None
+    while True:
+        attack0 = attacks0[front0]
+        attack1 = attacks1[front1]
+        health0 = healths0[front0]
+        health1 = healths1[front1]
+        # Turns until each front dies. A front with no health left dies on
+        # the first hit, even for no damage.
+        lasts0 = _turns_to_die(health0, attack1)
+        lasts1 = _turns_to_die(health1, attack0)
+        step = min(lasts0, lasts1)
+        if max_turns is not None:
+            step = min(step, max_turns - turns)
+        if step <= 0 or step == _NEVER:
+            break
+        healths0[front0] = health0 - attack1 * step
+        healths1[front1] = health1 - attack0 * step
+        turns += step
+        if step == lasts0:
+            front0 += 1
+        if step == lasts1:
+            front1 += 1
+        if front0 == size0:
+            winner = 1
+            break
+        if front1 == size1:
+            winner = 0
+            break
+    return VanillaOutcome(
+        winner, turns, attacks, healths, (front0, front1), timed_out=winner is None
+    )
+
+
+def _turns_to_die(health: int, damage: int) -> int:
+    """
+    Returns how many hits of the given damage a boi takes to die.
+    """
+    if damage <= 0:
+        # Health never goes down after the first hit
+        return 1 if health - damage <= 0 else _NEVER
+    return max(1, -(-health // damage))
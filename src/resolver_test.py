@@ -0,0 +1,167 @@
+import contextlib
+import random
+import unittest
+
+from batch_runner import build_team, run_battle
+from battle_demo import (
+    create_ant,
+    create_beaver,
+    create_cricket,
+    create_dodo,
+    create_mosquito,
+)
+from battle_system import BattleSystem
+from boi import BoiBuilder
+from effect import EffectBuilder
+from resolver import resolve_vanilla
+from team import Team
+
+
+def random_team(rng, min_stat, max_stat):
+    """A random vanilla team of 1 to 5 bois"""
+    return [
+        (rng.randint(min_stat, max_stat), rng.randint(min_stat, max_stat))
+        for _ in range(rng.randint(1, 5))
+    ]
+
+
+def random_matchups(seed, count=300):
+    """Random matchups, including bois with no attack or health to start with"""
+    rng = random.Random(seed)
+    return [
+        (random_team(rng, min_stat, max_stat), random_team(rng, min_stat, max_stat))
+        for min_stat, max_stat in ((1, 10), (0, 3), (-2, 2), (1, 50))
+        for _ in range(count)
+    ]
+
+
+def mixed_team(rng):
+    """A random team of demo bois with triggers and vanilla bois"""
+    makers = [create_ant, create_beaver, create_cricket, create_dodo, create_mosquito]
+    bois = []
+    for _ in range(rng.randint(1, 5)):
+        if rng.random() < 0.5:
+            bois.append(rng.choice(makers)())
+        else:
+            bois.append(
+                BoiBuilder()
+                .set_type_name("Vanilla")
+                .set_attack(rng.randint(1, 6))
+                .set_health(rng.randint(1, 6))
+                .build()
+            )
+    return Team(bois)
+
+
+def team_state(team):
+    """The identity and stats of a team's bois, in order"""
+    return [(boi.id, boi.attack, boi.health) for boi in team.bois]
+
+
+class ResolverTest(unittest.TestCase):
+    """Differential tests of the vanilla resolver against the event engine"""
+
+    def test_matches_event_engine(self):
+        """Test that winners, turns and survivors match, with turn limits"""
+        for max_turns in (3, 100):
+            for index, matchup in enumerate(random_matchups(max_turns)):
+                expected = run_battle(
+                    index, matchup, max_turns=max_turns, use_resolver=False
+                )
+                result = run_battle(index, matchup, max_turns=max_turns)
+                self.assertEqual(
+                    (result.winner, result.turns, result.survivors),
+                    (expected.winner, expected.turns, expected.survivors),
+                    matchup,
+                )
+                self.assertEqual(result.timed_out, expected.timed_out)
+
+    def test_known_outcomes(self):
+        """Test a few battles worked out by hand"""
+        # Both fronts die on turn 2, then team 0's second boi wins on turn 3
+        outcome = resolve_vanilla([(2, 4), (5, 2)], [(2, 3), (1, 2)])
+        self.assertEqual((outcome.winner, outcome.turns), (0, 3))
+        self.assertEqual(outcome.survivors(0), [(5, 1)])
+        self.assertEqual(outcome.survivors(1), [])
+        self.assertEqual(outcome.dead, (1, 2))
+        # Mutual wipe outs go to team 1, like in BattleSystem
+        self.assertEqual(resolve_vanilla([(3, 3)], [(3, 3)]).winner, 1)
+        # Neither side can hurt the other
+        stalemate = resolve_vanilla([(0, 3)], [(0, 3)])
+        self.assertTrue(stalemate.timed_out)
+        self.assertEqual(stalemate.turns, 0)
+        self.assertEqual(resolve_vanilla([(0, 3)], [(0, 3)], max_turns=7).turns, 7)
+
+    def test_battle_system_resolves_vanilla_battles(self):
+        """Test that run_to_end leaves the same bois, with the same stats"""
+        for matchup in random_matchups(1, count=50):
+            battles = []
+            for use_resolver in (False, True):
+                battle = BattleSystem(
+                    build_team(matchup[0]),
+                    build_team(matchup[1]),
+                    use_resolver=use_resolver,
+                )
+                # Both battles get bois with the same ids
+                for team in battle.teams:
+                    for position, boi in enumerate(team.bois):
+                        boi.id = position
+                battle.run_to_end(max_turns=100)
+                battles.append(battle)
+            slow, fast = battles
+            self.assertEqual(
+                (fast.winner, fast.turn, fast.battle_over),
+                (slow.winner, slow.turn, slow.battle_over),
+            )
+            for fast_team, slow_team in zip(fast.teams, slow.teams):
+                self.assertEqual(team_state(fast_team), team_state(slow_team))
+
+    def test_hands_off_once_triggers_are_gone(self):
+        """Test that battles resolved part way through end the same way"""
+        handed_off = 0
+        for seed in range(200):
+            battles = []
+            for use_resolver in (False, True):
+                rng = random.Random(seed)
+                battle = BattleSystem(
+                    mixed_team(rng), mixed_team(rng), use_resolver=use_resolver
+                )
+                with contextlib.redirect_stdout(None):
+                    battle.run_to_end(max_turns=100)
+                battles.append(battle)
+            slow, fast = battles
+            self.assertIsNone(slow.resolved_at)
+            if fast.resolved_at:
+                handed_off += 1
+            self.assertEqual(
+                (fast.winner, fast.turn, fast.battle_over),
+                (slow.winner, slow.turn, slow.battle_over),
+            )
+            for fast_team, slow_team in zip(fast.teams, slow.teams):
+                self.assertEqual(
+                    [(b.type_name, b.attack, b.health) for b in fast_team.bois],
+                    [(b.type_name, b.attack, b.health) for b in slow_team.bois],
+                )
+        self.assertGreater(handed_off, 0)
+
+    def test_only_vanilla_bois_are_resolved(self):
+        """Test that triggers, effects and observers rule the resolver out"""
+        self.assertTrue(BoiBuilder().build().is_vanilla())
+        self.assertFalse(create_dodo().is_vanilla())
+        shielded = BoiBuilder().build()
+        shielded.effect = EffectBuilder().add_trigger("damage", print).build()
+        self.assertFalse(shielded.is_vanilla())
+        # Effects without battle triggers are fine
+        shielded.effect = EffectBuilder().add_trigger("item_used", print).build()
+        self.assertTrue(shielded.is_vanilla())
+
+        team0, team1 = build_team([(1, 2)]), build_team([(1, 2)])
+        seen = []
+        battle = BattleSystem(team0, team1, [seen.append])
+        battle.run_to_end()
+        self.assertEqual(battle.winner, 1)
+        self.assertTrue(seen)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,12 +5,23 @@ Demo script for shop system implementing Super Auto Pets characters.
 from boi import BoiBuilder
 from team import Team
 from shop_system import ShopSystem
-from system import Event
+from system import observes
+from events import (
+    BuyAndMergeBoiEvent,
+    BuyBoiEvent,
+    BuyItemEvent,
+    DeathEvent,
+    MergeBoiEvent,
+    RollEvent,
+    SellBoiEvent,
+    SwapBoiEvent,
+)
 from pack import Pack
 from item import Item
 from effect import EffectBuilder
 
 
+@observes("purchased", "sold", "item_used", "levelup", "buy_and_merge_boi")
 def print_event(event):
     """Print event information for debugging."""
     if event.type == "purchased":
@@ -131,9 +142,7 @@ def create_pill():
         .add_trigger(
             "item_used",
             lambda effect, system, event: (
-                system.send_event(
-                    Event(type="death", target=event.data["target"], source=None)
-                ),
+                system.send_event(DeathEvent(target=event.target)),
                 print(f"{event.data['target'].type_name} was killed by Pill!"),
             ),
         ),
@@ -240,7 +249,7 @@ def handle_buy_boi(shop):
             return
 
         boi = shop.shop_bois[choice - 1]
-        shop.send_event(Event(type="buy_boi", boi=boi))
+        shop.send_event(BuyBoiEvent(boi=boi))
         shop._process_all_queue_events()
         print(f"Successfully bought {boi.type_name}!")
 
@@ -282,7 +291,7 @@ def handle_buy_item(shop):
             return
 
         target_boi = shop.get_team().bois[boi_choice - 1]
-        shop.send_event(Event(type="buy_item", item=item, target_boi=target_boi))
+        shop.send_event(BuyItemEvent(item=item, target_boi=target_boi))
         shop._process_all_queue_events()
         print(f"Successfully used {item.name} on {target_boi.type_name}!")
 
@@ -308,7 +317,7 @@ def handle_sell_boi(shop):
             return
 
         boi = shop.get_team().bois[choice - 1]
-        shop.send_event(Event(type="sell_boi", boi=boi))
+        shop.send_event(SellBoiEvent(boi=boi))
         shop._process_all_queue_events()
         print(f"Successfully sold {boi.type_name} for ${boi.level}!")
 
@@ -359,9 +368,7 @@ def handle_merge_boi(shop):
             return
 
         source_boi = shop.get_team().bois[source_choice - 1]
-        shop.send_event(
-            Event(type="merge_boi", target_boi=target_boi, source_boi=source_boi)
-        )
+        shop.send_event(MergeBoiEvent(target_boi=target_boi, source_boi=source_boi))
         shop._process_all_queue_events()
         print(
             f"Successfully merged {source_boi.type_name} into {target_boi.type_name}!"
@@ -400,7 +407,7 @@ def handle_swap_boi(shop):
             return
 
         boi2 = shop.get_team().bois[boi2_choice - 1]
-        shop.send_event(Event(type="swap_boi", boi1=boi1, boi2=boi2))
+        shop.send_event(SwapBoiEvent(boi1=boi1, boi2=boi2))
         shop._process_all_queue_events()
         print(f"Successfully swapped {boi1.type_name} and {boi2.type_name}!")
 
@@ -414,7 +421,7 @@ def handle_roll(shop):
         print("Not enough money to roll! (Costs $1)")
         return
 
-    shop.send_event(Event(type="roll"))
+    shop.send_event(RollEvent())
     shop._process_all_queue_events()
     print("Successfully rolled the shop!")
 
@@ -471,9 +478,7 @@ def handle_buy_and_merge_boi(shop):
 
         target_boi = shop.get_team().bois[target_choice - 1]
 
-        shop.send_event(
-            Event(type="buy_and_merge_boi", bought=shop_boi, target=target_boi)
-        )
+        shop.send_event(BuyAndMergeBoiEvent(bought=shop_boi, target=target_boi))
         shop._process_all_queue_events()
         print(
             f"Successfully bought {shop_boi.type_name} and merged into {target_boi.type_name}!"
@@ -1,7 +1,23 @@
-from typing import Callable, List, Any, cast
+from typing import Callable, List, Any, Optional, cast
 import random
 
 from system import Event
+from event_queue import EventQueue
+from events import (
+    BuyAndMergeBoiEvent,
+    BuyBoiEvent,
+    BuyItemEvent,
+    ItemUsedEvent,
+    LevelUpEvent,
+    MergeBoiEvent,
+    PurchasedEvent,
+    RollEvent,
+    SellBoiEvent,
+    SoldEvent,
+    SwapBoiEvent,
+    ToggleFreezeBoiEvent,
+    ToggleFreezeItemEvent,
+)
 from team_system import TeamSystem
 from team import Team, MAX_TEAM_SIZE
 from boi import Boi, MAX_BOI_LEVEL, LEVEL_UP_EXPERIENCE, MAX_ATTACK, MAX_HEALTH
@@ -25,8 +41,15 @@ class ShopSystem(TeamSystem):
         event_callbacks: List[Callable[[Event], None]],
         roll_price: int = 1,
         boi_price: int = 3,
+        event_queue: Optional[EventQueue] = None,
+        boi_id_seed: Optional[int] = None,
+        roll: bool = True,
     ) -> None:
-        super().__init__([team], event_callbacks)
+        """
+        Unless roll is unset the shop is stocked with a free roll, rather
+        than starting empty, e.g. to be filled from a snapshot.
+        """
+        super().__init__([team], event_callbacks, event_queue, boi_id_seed)
         self.pack = pack
         self.tier = tier
         self.money = money
@@ -41,7 +64,8 @@ class ShopSystem(TeamSystem):
             raise ValueError("Invalid tier")
 
         # Initially populate the shop
-        self._free_roll()
+        if roll:
+            self._free_roll()
 
     def get_team(self) -> Team:
         """
@@ -55,24 +79,24 @@ class ShopSystem(TeamSystem):
         """
         super()._process_queue_event(event)
         # Handle events related to the shop system
-        match event.type:
-            case "buy_item":
+        match event.code:
+            case BuyItemEvent.code:
                 self._buy_item(event)
-            case "buy_boi":
+            case BuyBoiEvent.code:
                 self._buy_boi(event)
-            case "sell_boi":
+            case SellBoiEvent.code:
                 self._sell_boi(event)
-            case "merge_boi":
+            case MergeBoiEvent.code:
                 self._merge_boi(event)
-            case "buy_and_merge_boi":
+            case BuyAndMergeBoiEvent.code:
                 self._buy_and_merge_boi(event)
-            case "swap_boi":
+            case SwapBoiEvent.code:
                 self._swap_boi(event)
-            case "roll":
+            case RollEvent.code:
                 self._roll()
-            case "toggle_freeze_item":
+            case ToggleFreezeItemEvent.code:
                 self._toggle_freeze_item(event)
-            case "toggle_freeze_boi":
+            case ToggleFreezeBoiEvent.code:
                 self._toggle_freeze_boi(event)
             case _:
                 pass
@@ -107,20 +131,18 @@ class ShopSystem(TeamSystem):
         while len(self.shop_bois) > tier_bois:
             self.shop_bois.pop()
 
+        boi_builders, item_builders = self.pack.shop_builders(self.tier)
+
         # Generate new bois for the shop
-        boi_builders = []
-        for tier in range(1, self.tier + 1):
-            boi_builders.extend(self.pack.tiers[tier - 1].boi_builders)
         for _ in range(tier_bois - len(self.shop_bois)):
             boi_template = random.choice(boi_builders)
-            self.shop_bois.append(boi_template.build())
+            self.shop_bois.append(boi_template.build(self.boi_ids))
 
         # Generate new items for the shop
-        available_items = []
-        for tier in range(1, self.tier + 1):
-            available_items.extend(self.pack.tiers[tier - 1].item_builders)
+        # Each slot is an Item sharing its builder's template, with nothing
+        # else made until it's used, see ItemBuilder.build
         for _ in range(tier_items - len(self.shop_items)):
-            self.shop_items.append(random.choice(available_items).build())
+            self.shop_items.append(random.choice(item_builders).build())
 
     def _roll(self) -> None:
         """
@@ -158,8 +180,8 @@ class ShopSystem(TeamSystem):
         - 'item': The Item object to buy
         - 'target_boi': The Boi to give the item to
         """
-        item = event.data.get("item")
-        target_boi = event.data.get("target_boi")
+        item = getattr(event, "item", None)
+        target_boi = getattr(event, "target_boi", None)
 
         if not self.valid_buy_item(item, target_boi):
             raise ValueError("Invalid item or not enough money")
@@ -172,7 +194,7 @@ class ShopSystem(TeamSystem):
         self.shop_items.remove(item)
 
         # Send event for purchase
-        self.send_event(Event(type="item_used", target=target_boi, item=item))
+        self.send_event(ItemUsedEvent(target=target_boi, item=item))
 
     def valid_buy_boi(self, boi: Any) -> bool:
         """
@@ -196,7 +218,7 @@ class ShopSystem(TeamSystem):
         - 'boi': The Boi object to buy
         - 'callback': Function to notify of success/failure
         """
-        boi = event.data.get("boi")
+        boi = getattr(event, "boi", None)
 
         # Validate boi exists in shop
         if not self.valid_buy_boi(boi):
@@ -209,7 +231,7 @@ class ShopSystem(TeamSystem):
         self.shop_bois.remove(boi)
 
         # Send event for purchase
-        self.send_event(Event(type="purchased", target=boi))
+        self.send_event(PurchasedEvent(target=boi))
 
     def valid_sell_boi(self, boi: Any) -> bool:
         """
@@ -229,7 +251,7 @@ class ShopSystem(TeamSystem):
         The event should have:
         - 'boi': The Boi object to sell
         """
-        boi = event.data.get("boi")
+        boi = getattr(event, "boi", None)
 
         if not self.valid_sell_boi(boi):
             raise ValueError("Invalid boi for selling")
@@ -241,7 +263,7 @@ class ShopSystem(TeamSystem):
         self.get_team().bois.remove(boi)
 
         # Send event for sale
-        self.send_event(Event(type="sold", target=boi))
+        self.send_event(SoldEvent(target=boi))
 
     def valid_merge_boi(self, target_boi: Any, source_boi: Any) -> bool:
         """
@@ -256,7 +278,7 @@ class ShopSystem(TeamSystem):
         return (
             target_boi in self.get_team().bois
             and source_boi in self.get_team().bois
-            and target_boi.type_name == source_boi.type_name
+            and target_boi.same_type(source_boi)
         )
 
     def _merge_boi(self, event: Event) -> None:
@@ -268,8 +290,8 @@ class ShopSystem(TeamSystem):
         - 'target_boi': The main Boi to keep and level up
         - 'source_boi': The Boi to merge into the target
         """
-        target_boi = event.data.get("target_boi")
-        source_boi = event.data.get("source_boi")
+        target_boi = getattr(event, "target_boi", None)
+        source_boi = getattr(event, "source_boi", None)
 
         if not self.valid_merge_boi(target_boi, source_boi):
             raise ValueError("Invalid bois for merging")
@@ -297,7 +319,7 @@ class ShopSystem(TeamSystem):
         ):
             target_boi.experience -= LEVEL_UP_EXPERIENCE
             target_boi.level += 1
-            self.send_event(Event(type="levelup", target=target_boi))
+            self.send_event(LevelUpEvent(target=target_boi))
         if target_boi.level == MAX_BOI_LEVEL:
             target_boi.experience = 0
         assert target_boi.level <= MAX_BOI_LEVEL, "Boi level exceeded maximum"
@@ -320,7 +342,7 @@ class ShopSystem(TeamSystem):
             return False
         if target not in self.get_team().bois:
             return False
-        if bought.type_name != target.type_name:
+        if not bought.same_type(target):
             return False
         if self.money < self.boi_price:
             return False
@@ -334,8 +356,8 @@ class ShopSystem(TeamSystem):
         - 'bought': The Boi object to buy
         - 'target': The Boi to merge into
         """
-        bought = event.data.get("bought")
-        target = event.data.get("target")
+        bought = getattr(event, "bought", None)
+        target = getattr(event, "target", None)
 
         if not self.valid_buy_and_merge_boi(bought, target):
             raise ValueError("Invalid bois for buying and merging")
@@ -350,7 +372,7 @@ class ShopSystem(TeamSystem):
         self.teams[0].bois.append(bought)
 
         # Merge the bois
-        self._merge_boi(Event(type="merge_boi", target_boi=target, source_boi=bought))
+        self._merge_boi(MergeBoiEvent(target_boi=target, source_boi=bought))
 
     def valid_swap_boi(self, boi1: Any, boi2: Any) -> bool:
         """
@@ -376,8 +398,8 @@ class ShopSystem(TeamSystem):
         - 'boi1': The first Boi to swap
         - 'boi2': The second Boi to swap
         """
-        boi1 = event.data.get("boi1")
-        boi2 = event.data.get("boi2")
+        boi1 = getattr(event, "boi1", None)
+        boi2 = getattr(event, "boi2", None)
         if not self.valid_swap_boi(boi1, boi2):
             raise ValueError("Invalid bois for swapping")
         boi1 = cast(Boi, boi1)
@@ -404,7 +426,7 @@ class ShopSystem(TeamSystem):
         The event should have:
         - 'item': The Item object to toggle
         """
-        item = event.data.get("item")
+        item = getattr(event, "item", None)
 
         if not self.valid_toggle_freeze_item(item):
             raise ValueError("Invalid item for freezing/unfreezing")
@@ -433,7 +455,7 @@ class ShopSystem(TeamSystem):
         The event should have:
         - 'boi': The Boi object to toggle
         """
-        boi = event.data.get("boi")
+        boi = getattr(event, "boi", None)
 
         if not self.valid_toggle_freeze_boi(boi):
             raise ValueError("Invalid boi for freezing/unfreezing")
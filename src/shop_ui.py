@@ -11,7 +11,19 @@ from typing import List, Dict, Optional, Tuple, Any, Callable
 from boi import BoiBuilder
 from team import Team
 from shop_system import ShopSystem
-from system import Event
+from system import Event, observes
+from events import (
+    BuyAndMergeBoiEvent,
+    BuyBoiEvent,
+    BuyItemEvent,
+    DeathEvent,
+    MergeBoiEvent,
+    RollEvent,
+    SellBoiEvent,
+    SwapBoiEvent,
+    ToggleFreezeBoiEvent,
+    ToggleFreezeItemEvent,
+)
 from pack import Pack
 from item import ItemBuilder
 from effect import EffectBuilder
@@ -435,7 +447,7 @@ class ShopUI:
     def _on_roll_click(self):
         """Handle roll shop button click"""
         try:
-            self.shop.send_event(Event(type="roll"))
+            self.shop.send_event(RollEvent())
             self.shop._process_all_queue_events()
             self.info_panel.add_message(
                 f"Shop rolled for $1. Money remaining: ${self.shop.money}"
@@ -511,6 +523,7 @@ class ShopUI:
         # Deselect everything
         self._deselect_all()
 
+    @observes("purchased", "sold", "item_used", "levelup", "buy_and_merge_boi")
     def _handle_event(self, event: Event):
         """Process game events for UI updates"""
         if event.type == "purchased":
@@ -564,7 +577,7 @@ class ShopUI:
 
         boi = self.selected_shop_boi.boi
         try:
-            self.shop.send_event(Event(type="buy_boi", boi=boi))
+            self.shop.send_event(BuyBoiEvent(boi=boi))
             self.shop._process_all_queue_events()
             self.update_cards()
             self._deselect_all()
@@ -580,7 +593,7 @@ class ShopUI:
 
         boi = self.selected_team_boi.boi
         try:
-            self.shop.send_event(Event(type="sell_boi", boi=boi))
+            self.shop.send_event(SellBoiEvent(boi=boi))
             self.shop._process_all_queue_events()
             self.update_cards()
             self._deselect_all()
@@ -619,7 +632,7 @@ class ShopUI:
 
             # Merge
             self.shop.send_event(
-                Event(type="merge_boi", target_boi=target_boi, source_boi=source_boi)
+                MergeBoiEvent(target_boi=target_boi, source_boi=source_boi)
             )
             self.shop._process_all_queue_events()
             self.update_cards()
@@ -651,7 +664,7 @@ class ShopUI:
             self.animations.append(MoveAnimation(start_pos2, start_pos1, BLUE, 15, 45))
 
             # Swap
-            self.shop.send_event(Event(type="swap_boi", boi1=boi1, boi2=boi2))
+            self.shop.send_event(SwapBoiEvent(boi1=boi1, boi2=boi2))
             self.shop._process_all_queue_events()
             self.update_cards()
             self._deselect_all()
@@ -667,9 +680,7 @@ class ShopUI:
         item = self.selected_item.item
 
         try:
-            self.shop.send_event(
-                Event(type="buy_item", item=item, target_boi=target_boi)
-            )
+            self.shop.send_event(BuyItemEvent(item=item, target_boi=target_boi))
             self.shop._process_all_queue_events()
             self.update_cards()
             self._deselect_all()
@@ -706,9 +717,7 @@ class ShopUI:
             self.animations.append(MoveAnimation(start_pos, end_pos, YELLOW, 15, 45))
 
             # Buy and merge
-            self.shop.send_event(
-                Event(type="buy_and_merge_boi", bought=shop_boi, target=team_boi)
-            )
+            self.shop.send_event(BuyAndMergeBoiEvent(bought=shop_boi, target=team_boi))
             self.shop._process_all_queue_events()
             self.update_cards()
             self._deselect_all()
@@ -720,7 +729,7 @@ class ShopUI:
     def _toggle_freeze_boi(self, boi):
         """Toggle freeze state for a shop boi"""
         try:
-            self.shop.send_event(Event(type="toggle_freeze_boi", boi=boi))
+            self.shop.send_event(ToggleFreezeBoiEvent(boi=boi))
             self.shop._process_all_queue_events()
             frozen_status = "frozen" if boi in self.shop.frozen_bois else "unfrozen"
             self.info_panel.add_message(f"{boi.type_name} {frozen_status}!")
@@ -732,7 +741,7 @@ class ShopUI:
     def _toggle_freeze_item(self, item):
         """Toggle freeze state for a shop item"""
         try:
-            self.shop.send_event(Event(type="toggle_freeze_item", item=item))
+            self.shop.send_event(ToggleFreezeItemEvent(item=item))
             self.shop._process_all_queue_events()
             frozen_status = "frozen" if item in self.shop.frozen_items else "unfrozen"
             self.info_panel.add_message(f"{item.name} {frozen_status}!")
@@ -815,11 +824,7 @@ class ShopUI:
                 .add_trigger(
                     "item_used",
                     lambda effect, system, event: (
-                        system.send_event(
-                            Event(
-                                type="death", target=event.data["target"], source=None
-                            )
-                        )
+                        system.send_event(DeathEvent(target=event.target))
                     ),
                 )
             )
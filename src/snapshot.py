@@ -0,0 +1,437 @@
+"""
+Compact binary snapshots of bois, teams and shops.
+Bois and items refer to the builders in their pack by type id, rather than
+carrying their callbacks, so a snapshot can only be read with the same pack.
+
+A snapshot is a record: a header giving the format version, what kind of
+record it is and its length, then its body. Records can be written into,
+and read from, any buffer such as a bytearray, memoryview or mmap, without
+copying it. Several records can be stored back to back, see record_size.
+"""
+
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, cast
+import struct
+
+from boi import Boi, BoiBuilder
+from effect import Effect
+from item import Item, ItemBuilder
+from pack import Pack
+from shop_system import ShopSystem
+from system import EventCallback
+from team import Team
+
+FORMAT_VERSION = 2
+MAGIC = b"SABZ"
+
+KIND_BOI = 1
+KIND_TEAM = 2
+KIND_SHOP = 3
+
+# magic, version, kind, length of the whole record in bytes
+HEADER = struct.Struct("<4sBBI")
+# id, type id, attack, health, level, experience, effect code
+BOI = struct.Struct("<QHiiBBH")
+# tier, money, roll price, boi price
+SHOP = struct.Struct("<BiHH")
+COUNT = struct.Struct("<B")
+ITEM = struct.Struct("<H")
+# Index of a frozen boi or item in the shop, or NOT_IN_SHOP if it follows
+FROZEN = struct.Struct("<h")
+
+# Effect codes. Items' effects follow, so the effect of item type i is
+# FIRST_ITEM_EFFECT + i
+NO_EFFECT = 0
+DEFAULT_EFFECT = 1
+FIRST_ITEM_EFFECT = 2
+
+NOT_IN_SHOP = -1
+
+Buffer = Any  # bytes, bytearray, memoryview, mmap, ...
+
+
+class SnapshotError(ValueError):
+    """
+    Raised when something can't be written to or read from a snapshot.
+    """
+
+
+def encode_boi(boi: Boi, pack: Pack) -> bytes:
+    """
+    Returns a snapshot of a boi built from one of the pack's builders.
+    """
+    buffer = bytearray(HEADER.size + BOI.size)
+    encode_boi_into(buffer, 0, boi, pack)
+    return bytes(buffer)
+
+
+def encode_boi_into(buffer: Buffer, offset: int, boi: Boi, pack: Pack) -> int:
+    """
+    Writes a snapshot of a boi into buffer at offset.
+    Returns the offset just after it.
+    """
+    end = _write_boi(buffer, offset + HEADER.size, boi, pack)
+    HEADER.pack_into(buffer, offset, MAGIC, FORMAT_VERSION, KIND_BOI, end - offset)
+    return end
+
+
+def decode_boi(buffer: Buffer, pack: Pack, offset: int = 0) -> Boi:
+    """
+    Reads a boi snapshot from buffer at offset.
+    """
+    boi, _ = _read_boi(buffer, _read_header(buffer, offset, KIND_BOI), pack)
+    return boi
+
+
+def encode_team(team: Team, pack: Pack) -> bytes:
+    """
+    Returns a snapshot of a team whose bois were built from the pack.
+    """
+    buffer = bytearray(team_record_size(team))
+    encode_team_into(buffer, 0, team, pack)
+    return bytes(buffer)
+
+
+def team_record_size(team: Team) -> int:
+    """
+    Returns the size of a team's snapshot in bytes, e.g. to allocate a buffer.
+    """
+    return HEADER.size + _bois_size(team.bois)
+
+
+def encode_team_into(buffer: Buffer, offset: int, team: Team, pack: Pack) -> int:
+    """
+    Writes a snapshot of a team into buffer at offset.
+    Returns the offset just after it.
+    """
+    end = _write_bois(buffer, offset + HEADER.size, team.bois, pack)
+    HEADER.pack_into(buffer, offset, MAGIC, FORMAT_VERSION, KIND_TEAM, end - offset)
+    return end
+
+
+def decode_team(buffer: Buffer, pack: Pack, offset: int = 0) -> Team:
+    """
+    Reads a team snapshot from buffer at offset.
+    """
+    bois, _ = _read_bois(buffer, _read_header(buffer, offset, KIND_TEAM), pack)
+    return Team(bois)
+
+
+def team_boi_fields(buffer: Buffer, offset: int = 0) -> List[Tuple[int, ...]]:
+    """
+    Returns the stored id, type id, attack, health, level, experience and
+    effect code of each boi of a team snapshot, without building them.
+    """
+    offset = _read_header(buffer, offset, KIND_TEAM)
+    (count,) = COUNT.unpack_from(buffer, offset)
+    offset += COUNT.size
+    return [
+        BOI.unpack_from(buffer, offset + BOI.size * index) for index in range(count)
+    ]
+
+
+def encode_shop(shop: ShopSystem) -> bytes:
+    """
+    Returns a snapshot of a shop's team, offerings, money and prices.
+    Event callbacks and queued events are not included.
+    """
+    buffer = bytearray(shop_record_size(shop))
+    encode_shop_into(buffer, 0, shop)
+    return bytes(buffer)
+
+
+def shop_record_size(shop: ShopSystem) -> int:
+    """
+    Returns the size of a shop's snapshot in bytes, e.g. to allocate a buffer.
+    """
+    size = HEADER.size + SHOP.size
+    size += _bois_size(shop.get_team().bois) + _bois_size(shop.shop_bois)
+    size += COUNT.size + ITEM.size * len(shop.shop_items)
+    size += COUNT.size + FROZEN.size * len(shop.frozen_bois)
+    size += BOI.size * sum(boi not in shop.shop_bois for boi in shop.frozen_bois)
+    size += COUNT.size + FROZEN.size * len(shop.frozen_items)
+    size += ITEM.size * sum(item not in shop.shop_items for item in shop.frozen_items)
+    return size
+
+
+def encode_shop_into(buffer: Buffer, offset: int, shop: ShopSystem) -> int:
+    """
+    Writes a snapshot of a shop into buffer at offset.
+    Returns the offset just after it.
+    """
+    pack = shop.pack
+    position = offset + HEADER.size
+    SHOP.pack_into(
+        buffer, position, shop.tier, shop.money, shop.roll_price, shop.boi_price
+    )
+    position = _write_bois(buffer, position + SHOP.size, shop.get_team().bois, pack)
+    position = _write_bois(buffer, position, shop.shop_bois, pack)
+    position = _write_items(buffer, position, shop.shop_items, pack)
+    # Frozen bois and items are usually still on offer, so refer to those
+    _check_count(shop.frozen_bois)
+    COUNT.pack_into(buffer, position, len(shop.frozen_bois))
+    position += COUNT.size
+    for boi in shop.frozen_bois:
+        index = _index_in(shop.shop_bois, boi)
+        FROZEN.pack_into(buffer, position, index)
+        position += FROZEN.size
+        if index == NOT_IN_SHOP:
+            position = _write_boi(buffer, position, boi, pack)
+    _check_count(shop.frozen_items)
+    COUNT.pack_into(buffer, position, len(shop.frozen_items))
+    position += COUNT.size
+    for item in shop.frozen_items:
+        index = _index_in(shop.shop_items, item)
+        FROZEN.pack_into(buffer, position, index)
+        position += FROZEN.size
+        if index == NOT_IN_SHOP:
+            ITEM.pack_into(buffer, position, _item_type_id(item, pack))
+            position += ITEM.size
+    HEADER.pack_into(
+        buffer, offset, MAGIC, FORMAT_VERSION, KIND_SHOP, position - offset
+    )
+    return position
+
+
+def decode_shop(
+    buffer: Buffer,
+    pack: Pack,
+    offset: int = 0,
+    event_callbacks: Optional[List[EventCallback]] = None,
+    boi_id_seed: Optional[int] = None,
+) -> ShopSystem:
+    """
+    Reads a shop snapshot from buffer at offset.
+    Bois the shop builds from then on get ids counting up from boi_id_seed,
+    or from one past the largest id in the snapshot if not given.
+    """
+    position = _read_header(buffer, offset, KIND_SHOP)
+    tier, money, roll_price, boi_price = SHOP.unpack_from(buffer, position)
+    team_bois, position = _read_bois(buffer, position + SHOP.size, pack)
+    shop_bois, position = _read_bois(buffer, position, pack)
+    shop_items, position = _read_items(buffer, position, pack)
+    frozen_bois: List[Boi] = []
+    (count,) = COUNT.unpack_from(buffer, position)
+    position += COUNT.size
+    for _ in range(count):
+        (index,) = FROZEN.unpack_from(buffer, position)
+        position += FROZEN.size
+        if index == NOT_IN_SHOP:
+            boi, position = _read_boi(buffer, position, pack)
+        else:
+            boi = shop_bois[index]
+        frozen_bois.append(boi)
+    frozen_items: List[Item] = []
+    (count,) = COUNT.unpack_from(buffer, position)
+    position += COUNT.size
+    for _ in range(count):
+        (index,) = FROZEN.unpack_from(buffer, position)
+        position += FROZEN.size
+        if index == NOT_IN_SHOP:
+            (type_id,) = ITEM.unpack_from(buffer, position)
+            position += ITEM.size
+            item = _item_builder(pack, type_id).build()
+        else:
+            item = shop_items[index]
+        frozen_items.append(item)
+
+    if boi_id_seed is None:
+        ids = [boi.id for boi in team_bois + shop_bois + frozen_bois]
+        boi_id_seed = max(ids, default=-1) + 1
+    shop = ShopSystem(
+        Team(team_bois),
+        pack,
+        tier,
+        money,
+        [] if event_callbacks is None else event_callbacks,
+        roll_price,
+        boi_price,
+        boi_id_seed=boi_id_seed,
+        roll=False,
+    )
+    shop.shop_bois = shop_bois
+    shop.shop_items = shop_items
+    shop.frozen_bois = frozen_bois
+    shop.frozen_items = frozen_items
+    return shop
+
+
+def record_size(buffer: Buffer, offset: int = 0) -> int:
+    """
+    Returns the size in bytes of the record at offset, of any kind.
+    The next record, if any, starts that many bytes further on.
+    """
+    magic, version, _, length = HEADER.unpack_from(buffer, offset)
+    _check_header(magic, version)
+    return length
+
+
+def iter_records(buffer: Buffer) -> Iterator[int]:
+    """
+    Yields the offset of each record stored back to back in buffer.
+    """
+    offset = 0
+    while offset < len(buffer):
+        yield offset
+        offset += record_size(buffer, offset)
+
+
+def _read_header(buffer: Buffer, offset: int, kind: int) -> int:
+    """
+    Checks the header of the record at offset, and returns where its body starts.
+    """
+    magic, version, record_kind, _ = HEADER.unpack_from(buffer, offset)
+    _check_header(magic, version)
+    if record_kind != kind:
+        raise SnapshotError(f"Expected a record of kind {kind}, got {record_kind}.")
+    return offset + HEADER.size
+
+
+def _check_header(magic: bytes, version: int) -> None:
+    if magic != MAGIC:
+        raise SnapshotError("Not a snapshot.")
+    if version != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}.")
+
+
+def _check_count(values: Sequence) -> None:
+    if len(values) > 255:
+        raise SnapshotError(f"Can't store more than 255 entries, got {len(values)}.")
+
+
+def _index_in(values: Sequence, value: Any) -> int:
+    """
+    Returns the position of value in values by identity, or NOT_IN_SHOP.
+    """
+    for index, other in enumerate(values):
+        if other is value:
+            return index
+    return NOT_IN_SHOP
+
+
+def _bois_size(bois: Sequence[Boi]) -> int:
+    return COUNT.size + BOI.size * len(bois)
+
+
+def _write_bois(buffer: Buffer, offset: int, bois: Sequence[Boi], pack: Pack) -> int:
+    _check_count(bois)
+    COUNT.pack_into(buffer, offset, len(bois))
+    offset += COUNT.size
+    for boi in bois:
+        offset = _write_boi(buffer, offset, boi, pack)
+    return offset
+
+
+def _read_bois(buffer: Buffer, offset: int, pack: Pack) -> Tuple[List[Boi], int]:
+    (count,) = COUNT.unpack_from(buffer, offset)
+    offset += COUNT.size
+    bois = []
+    for _ in range(count):
+        boi, offset = _read_boi(buffer, offset, pack)
+        bois.append(boi)
+    return bois, offset
+
+
+def _write_items(buffer: Buffer, offset: int, items: Sequence[Item], pack: Pack) -> int:
+    _check_count(items)
+    COUNT.pack_into(buffer, offset, len(items))
+    offset += COUNT.size
+    for item in items:
+        ITEM.pack_into(buffer, offset, _item_type_id(item, pack))
+        offset += ITEM.size
+    return offset
+
+
+def _read_items(buffer: Buffer, offset: int, pack: Pack) -> Tuple[List[Item], int]:
+    (count,) = COUNT.unpack_from(buffer, offset)
+    offset += COUNT.size
+    items = []
+    for _ in range(count):
+        (type_id,) = ITEM.unpack_from(buffer, offset)
+        offset += ITEM.size
+        items.append(_item_builder(pack, type_id).build())
+    return items, offset
+
+
+def _write_boi(buffer: Buffer, offset: int, boi: Boi, pack: Pack) -> int:
+    """
+    Writes a boi's stats, and references to its builder and effect.
+    Raises SnapshotError if the boi has triggers its builder doesn't give,
+    since callbacks can't be stored, or stats too large for the format.
+    """
+    prototype = _boi_builder(pack, boi.type_id).boi
+    if prototype.type_name != boi.type_name:
+        raise SnapshotError(f"{boi} is from another pack than {pack.name}.")
+    if boi.triggers != prototype.triggers:
+        raise SnapshotError(f"{boi} has triggers its builder doesn't give.")
+    try:
+        BOI.pack_into(
+            buffer,
+            offset,
+            boi.id,
+            boi.type_id,
+            boi.attack,
+            boi.health,
+            boi.level,
+            boi.experience,
+            _effect_code(boi.effect, prototype.effect, pack),
+        )
+    except struct.error as error:
+        raise SnapshotError(f"{boi} can't be stored: {error}.") from error
+    return offset + BOI.size
+
+
+def _read_boi(buffer: Buffer, offset: int, pack: Pack) -> Tuple[Boi, int]:
+    boi_id, type_id, attack, health, level, experience, effect_code = BOI.unpack_from(
+        buffer, offset
+    )
+    boi = _boi_builder(pack, type_id).build(iter((boi_id,)))
+    boi.attack = attack
+    boi.health = health
+    boi.level = level
+    boi.experience = experience
+    if effect_code == NO_EFFECT:
+        boi.effect = None
+    elif effect_code != DEFAULT_EFFECT:
+        item_builder = _item_builder(pack, effect_code - FIRST_ITEM_EFFECT)
+        boi.effect = item_builder.template.effect_builder.build()
+    return boi, offset + BOI.size
+
+
+def _effect_code(
+    effect: Optional[Effect], default: Optional[Effect], pack: Pack
+) -> int:
+    """
+    Returns the code of an effect that is either the boi's default effect, or
+    that of one of the pack's items. Effects are matched by template, so one
+    changed after it was built can't be stored.
+    """
+    if effect is None:
+        return NO_EFFECT
+    if default is not None and effect.template is default.template:
+        return DEFAULT_EFFECT
+    for type_id, item_builder in enumerate(pack.item_builders):
+        effect_builder = item_builder.template.effect_builder
+        if effect.template is effect_builder.effect.template:
+            return FIRST_ITEM_EFFECT + type_id
+    raise SnapshotError(f"{effect} doesn't come from the boi or a pack item.")
+
+
+def _boi_builder(pack: Pack, type_id: Optional[int]) -> BoiBuilder:
+    try:
+        return pack.boi_builder(type_id)
+    except ValueError as error:
+        raise SnapshotError(str(error)) from error
+
+
+def _item_builder(pack: Pack, type_id: Optional[int]) -> ItemBuilder:
+    try:
+        return pack.item_builder(type_id)
+    except ValueError as error:
+        raise SnapshotError(str(error)) from error
+
+
+def _item_type_id(item: Item, pack: Pack) -> int:
+    type_id = item.type_id
+    if _item_builder(pack, type_id).template.name != item.name:
+        raise SnapshotError(f"{item.name} is from another pack than {pack.name}.")
+    return cast(int, type_id)
@@ -0,0 +1,166 @@
+import random
+import unittest
+
+from boi import BoiBuilder
+from effect import EffectBuilder
+from events import ToggleFreezeBoiEvent, ToggleFreezeItemEvent
+from item import ItemBuilder
+from pack import Pack
+from shop_system import ShopSystem
+from team import Team
+import snapshot
+
+
+def make_pack():
+    """Build a pack with a few bois and items, one boi with a default effect"""
+    pack = Pack("Test Pack", 1)
+    pack.add_boi_builder(
+        BoiBuilder().set_type_name("Ant").set_attack(2).set_health(1), 1
+    )
+    pack.add_boi_builder(
+        BoiBuilder()
+        .set_type_name("Beaver")
+        .set_attack(2)
+        .set_health(2)
+        .add_default_effect(EffectBuilder().set_name("Shield").build()),
+        1,
+    )
+    for name in ("Apple", "Honey"):
+        pack.add_item_builder(
+            ItemBuilder()
+            .set_name(name)
+            .set_price(3)
+            .set_effect_builder(EffectBuilder().set_name(f"{name} Effect")),
+            1,
+        )
+    pack.set_shop_tier_num_bois(1, 3)
+    pack.set_shop_tier_num_items(1, 2)
+    return pack
+
+
+def boi_state(boi):
+    """The parts of a boi a snapshot keeps"""
+    effect = None if boi.effect is None else boi.effect.template
+    return (boi.id, boi.type_name, boi.attack, boi.health, boi.level, effect)
+
+
+class SnapshotTest(unittest.TestCase):
+    """Test cases for binary snapshots"""
+
+    def setUp(self):
+        """Set up test environment before each test"""
+        random.seed(0)
+        self.pack = make_pack()
+        self.ant_builder, self.beaver_builder = self.pack.boi_builders
+
+    def test_team_round_trip(self):
+        """Test that stats, levels and effects survive a round trip"""
+        ant = self.ant_builder.build()
+        ant.attack = 7
+        ant.level = 2
+        ant.experience = 1
+        ant.health = -1
+        beaver = self.beaver_builder.build()
+        honey = self.pack.item_builders[1].build()
+        ant.effect = honey.create_effect()
+        team = Team([ant, beaver])
+
+        data = snapshot.encode_team(team, self.pack)
+        self.assertEqual(len(data), snapshot.team_record_size(team))
+        decoded = snapshot.decode_team(memoryview(data), self.pack)
+        self.assertEqual(
+            [boi_state(boi) for boi in decoded.bois],
+            [boi_state(boi) for boi in team.bois],
+        )
+        self.assertEqual(decoded.bois[0].experience, 1)
+        self.assertEqual(decoded.bois[1].effect.type_name, "Shield")
+
+    def test_records_back_to_back(self):
+        """Test that records can be written into and read from one buffer"""
+        teams = [Team([self.ant_builder.build()]), Team([])]
+        sizes = [snapshot.team_record_size(team) for team in teams]
+        archive = bytearray(sum(sizes) + snapshot.HEADER.size + snapshot.BOI.size)
+        offset = 0
+        for team in teams:
+            offset = snapshot.encode_team_into(archive, offset, team, self.pack)
+        boi = self.beaver_builder.build()
+        snapshot.encode_boi_into(archive, offset, boi, self.pack)
+
+        offsets = list(snapshot.iter_records(archive))
+        self.assertEqual(offsets, [0, sizes[0], sum(sizes)])
+        view = memoryview(archive)
+        first_team = snapshot.decode_team(view, self.pack, offsets[0])
+        self.assertEqual(len(first_team.bois), 1)
+        self.assertEqual(snapshot.decode_team(view, self.pack, offsets[1]).bois, [])
+        self.assertEqual(
+            boi_state(snapshot.decode_boi(view, self.pack, offsets[2])), boi_state(boi)
+        )
+        with self.assertRaises(snapshot.SnapshotError):
+            snapshot.decode_boi(view, self.pack, offsets[0])
+
+    def test_shop_round_trip(self):
+        """Test that a shop's team, offerings and frozen entries are kept"""
+        shop = ShopSystem(Team([self.ant_builder.build()]), self.pack, 1, 10, [])
+        shop.send_and_execute_event(ToggleFreezeBoiEvent(boi=shop.shop_bois[1]))
+        shop.send_and_execute_event(ToggleFreezeItemEvent(item=shop.shop_items[0]))
+        # A frozen item that was bought is no longer on offer
+        shop.send_and_execute_event(ToggleFreezeItemEvent(item=shop.shop_items[1]))
+        shop.shop_items.pop()
+
+        data = snapshot.encode_shop(shop)
+        self.assertEqual(len(data), snapshot.shop_record_size(shop))
+        decoded = snapshot.decode_shop(data, self.pack)
+        self.assertEqual((decoded.tier, decoded.money), (1, 10))
+        self.assertEqual(
+            [boi_state(boi) for boi in decoded.get_team().bois],
+            [boi_state(boi) for boi in shop.get_team().bois],
+        )
+        self.assertEqual(
+            [boi_state(boi) for boi in decoded.shop_bois],
+            [boi_state(boi) for boi in shop.shop_bois],
+        )
+        self.assertEqual(
+            [item.name for item in decoded.shop_items],
+            [item.name for item in shop.shop_items],
+        )
+        self.assertIs(decoded.frozen_bois[0], decoded.shop_bois[1])
+        self.assertIs(decoded.frozen_items[0], decoded.shop_items[0])
+        self.assertEqual(decoded.frozen_items[1].name, shop.frozen_items[1].name)
+        self.assertNotIn(decoded.frozen_items[1], decoded.shop_items)
+
+        # The decoded shop builds bois with fresh ids
+        decoded._free_roll()
+        ids = [boi.id for boi in shop.shop_bois + shop.get_team().bois]
+        self.assertGreater(decoded.shop_bois[-1].id, max(ids))
+
+    def test_large_stats_round_trip(self):
+        """Test that buffed stats fit, and stats that don't raise SnapshotError"""
+        ant = self.ant_builder.build()
+        ant.attack = 40000
+        ant.health = -40000
+        decoded = snapshot.decode_boi(snapshot.encode_boi(ant, self.pack), self.pack)
+        self.assertEqual((decoded.attack, decoded.health), (40000, -40000))
+
+        ant.level = 256
+        with self.assertRaises(snapshot.SnapshotError):
+            snapshot.encode_boi(ant, self.pack)
+
+    def test_unknown_triggers_and_effects_are_refused(self):
+        """Test that bois the pack can't rebuild aren't silently stored"""
+        ant = self.ant_builder.build()
+        ant.add_trigger("damage", lambda *_: None)
+        with self.assertRaises(snapshot.SnapshotError):
+            snapshot.encode_boi(ant, self.pack)
+
+        beaver = self.beaver_builder.build()
+        beaver.effect = EffectBuilder().set_name("Mystery").build()
+        with self.assertRaises(snapshot.SnapshotError):
+            snapshot.encode_boi(beaver, self.pack)
+
+        stranger = BoiBuilder().set_type_name("Zombie Cricket").build()
+        with self.assertRaises(snapshot.SnapshotError):
+            snapshot.encode_team(Team([stranger]), self.pack)
+
+
+if __name__ == "__main__":
+    unittest.main()
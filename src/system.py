@@ -3,24 +3,277 @@ Foundational classes for the system/event framework.
 """
 
 from abc import ABC, abstractmethod
-from typing import Callable, List, Deque
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    List,
+    Deque,
+    Iterable,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    TYPE_CHECKING,
+)
 from collections import deque
+import itertools
+import sys
+import time
 import uuid
 
+if TYPE_CHECKING:
+    from event_pool import EventPool
+    from event_queue import EventQueue
+    from profiler import EventProfiler
+    from tracer import EventTracer
+
+_EVENT_TYPE_CODES: Dict[str, int] = {}
+EVENT_TYPE_NAMES: List[str] = []
+
+
+# pylint: disable=redefined-builtin
+def event_type_code(type: str) -> int:
+    """
+    Returns the small integer code for an event type name.
+    Codes are interned on first use and stay stable for the life of the process.
+    """
+    code = _EVENT_TYPE_CODES.get(type)
+    if code is None:
+        code = len(EVENT_TYPE_NAMES)
+        _EVENT_TYPE_CODES[type] = code
+        EVENT_TYPE_NAMES.append(sys.intern(type))
+    return code
+
+
+def _trigger_key(key: Any) -> Any:
+    return event_type_code(key) if isinstance(key, str) else key
+
+
+class TriggerTable(dict):
+    """
+    Trigger callbacks keyed by event type code.
+    Event type names also work as keys, for code written when triggers were
+    keyed by name, and are stored under their codes.
+    Bois and effects only hand out read-only views of their tables, so a
+    change always goes through them and rebuilds their dispatch tables.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, triggers: Optional[Mapping[Any, Any]] = None) -> None:
+        super().__init__(
+            (_trigger_key(key), value) for key, value in (triggers or {}).items()
+        )
+
+    def __missing__(self, key: Any) -> Any:
+        if isinstance(key, str):
+            return self[event_type_code(key)]
+        raise KeyError(key)
+
+    def __contains__(self, key: Any) -> bool:
+        return super().__contains__(_trigger_key(key))
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        return super().get(_trigger_key(key), default)
+
 
 class Event:
-    """Base class for all system events."""
+    """
+    Base class for all system events.
+    Constructing an Event directly, e.g. Event(type="roll"), makes an ad-hoc
+    event whose data lives in a dict. Fields of the data can also be read as
+    attributes. Known event types have slotted subclasses (see TypedEvent).
+    """
+
+    __slots__ = ("id", "_uuid", "type", "code", "target", "source", "_data")
+
+    # Name of the field holding the event's scalar payload, if any
+    PAYLOAD: ClassVar[Optional[str]] = None
 
     # pylint: disable=redefined-builtin
     def __init__(self, type: str, **data) -> None:
-        self.uuid = str(uuid.uuid4())
-        self.type = type
-        self.data = data
+        # Assigned by the system that processes the event
+        self.id: Optional[int] = None
+        self._uuid: Optional[str] = None
+        self.type: str = type
+        self.code: int = event_type_code(type)
+        self.target: Any = data.get("target")
+        self.source: Any = data.get("source")
+        self._data = data
+
+    @property
+    def uuid(self) -> str:
+        """
+        Globally unique string id for the event.
+        Generated on first access, since most events never need one.
+        """
+        if self._uuid is None:
+            self._uuid = str(uuid.uuid4())
+        return self._uuid
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """
+        The event data as a dict of field name to value.
+        """
+        return self._data
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for fields that aren't slots, i.e. ad-hoc event data
+        if name == "_data":
+            raise AttributeError(name)
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(f"{self.type!r} event has no field {name!r}") from None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.type}, {self.data})"
+
+    def copy(self, convert: Optional[Callable[[Any], Any]] = None) -> "Event":
+        """
+        Returns a copy of the event with no id, as if it was never processed.
+        If given, convert is applied to each field, e.g. to swap bois for
+        their copies.
+        """
+        if convert is None:
+            convert = _unchanged
+        copied = Event(
+            self.type, **{name: convert(value) for name, value in self._data.items()}
+        )
+        copied.target = convert(self.target)
+        copied.source = convert(self.source)
+        return copied
+
+
+EVENT_CLASSES: Dict[int, Type["TypedEvent"]] = {}
+E = TypeVar("E", bound="TypedEvent")
+
+
+class TypedEvent(Event):
+    """
+    Base class for events of a known type.
+    Subclasses set TYPE and FIELDS, and declare their extra fields as slots.
+    The type name and code are class attributes rather than per-event data.
+    """
+
+    __slots__ = ()
+
+    TYPE: ClassVar[str]
+    FIELDS: ClassVar[Tuple[str, ...]] = ()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.type = cls.TYPE  # type: ignore[misc]
+        cls.code = event_type_code(cls.TYPE)  # type: ignore[misc]
+        EVENT_CLASSES[cls.code] = cls
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, target: Any = None, source: Any = None) -> None:
+        """
+        Sets every slot TypedEvent declares. Subclasses call this and then
+        set their own fields, so that EventPool can reuse an event by
+        calling __init__ again.
+        """
+        self.id = None
+        self._uuid = None
+        self.target = target
+        self.source = source
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """
+        The event fields as a dict, for code written against ad-hoc events.
+        """
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __getattr__(self, name: str) -> Any:
+        raise AttributeError(f"{type(self).__name__} has no field {name!r}")
+
+    def copy(self: E, convert: Optional[Callable[[Any], Any]] = None) -> E:
+        if convert is None:
+            convert = _unchanged
+        copied = type(self).__new__(type(self))
+        copied.id = None
+        copied._uuid = None
+        copied.target = convert(self.target)
+        copied.source = convert(self.source)
+        for name in self.FIELDS:
+            setattr(copied, name, convert(getattr(self, name)))
+        return copied
+
+
+def _unchanged(value: Any) -> Any:
+    return value
 
 
 EventCallback = Callable[[Event], None]
 
 
+def observes(*types: str) -> Callable[[EventCallback], EventCallback]:
+    """
+    Decorator declaring which event types an observer callback cares about.
+    Systems that support subscriptions only notify it of those types.
+    """
+
+    def decorate(callback: EventCallback) -> EventCallback:
+        callback.event_types = frozenset(types)  # type: ignore[attr-defined]
+        return callback
+
+    return decorate
+
+
+# Most events a single drain of the queue may process before it is stopped
+DEFAULT_EVENT_BUDGET = 10_000
+# Number of events inspected for a repeating pattern once the budget runs out
+CYCLE_WINDOW = 64
+
+# (event type, name of the event's target)
+EventSignature = Tuple[str, Optional[str]]
+
+
+def event_signature(event: Event) -> EventSignature:
+    """
+    Returns a short description of an event for cycle detection.
+    Targets are described by type name, since runaway loops such as repeated
+    summons create a fresh target object every time round.
+    """
+    target = event.target
+    if target is None:
+        return (event.type, None)
+    return (event.type, getattr(target, "type_name", type(target).__name__))
+
+
+def find_cycle(history: List[EventSignature]) -> Tuple[EventSignature, ...]:
+    """
+    Returns the shortest pattern that the history repeats.
+    Returns the whole history if it does not repeat.
+    """
+    size = len(history)
+    for period in range(1, size // 2 + 1):
+        if all(history[i] == history[i + period] for i in range(size - period)):
+            return tuple(history[size - period :])
+    return tuple(history)
+
+
+class EventBudgetExceededError(RuntimeError):
+    """
+    Raised when a single drain of a system's queue processes more events than
+    its budget, which almost always means triggers are re-enqueueing forever.
+    """
+
+    def __init__(self, budget: int, cycle: Tuple[EventSignature, ...]) -> None:
+        self.budget = budget
+        self.cycle = cycle
+        pattern = " -> ".join(
+            f"{name}({target})" if target else name for name, target in cycle
+        )
+        super().__init__(f"Event budget of {budget} exceeded, repeating: {pattern}")
+
+
 class System(ABC):
     """
     Base class for all systems.
@@ -28,8 +281,18 @@ class System(ABC):
     All systems have a queue of events to process.
     """
 
-    def __init__(self) -> None:
-        self.event_queue: Deque[Event] = deque()
+    def __init__(self, event_queue: Optional["EventQueue"] = None) -> None:
+        """
+        By default events are processed first in, first out.
+        Pass another queue backend, e.g. a PriorityEventQueue, to change that.
+        """
+        self.event_queue: "EventQueue" = deque() if event_queue is None else event_queue
+        self._event_ids = itertools.count()
+        # None disables the budget
+        self.event_budget: Optional[int] = DEFAULT_EVENT_BUDGET
+        self.profiler: Optional["EventProfiler"] = None
+        self.tracer: Optional["EventTracer"] = None
+        self.event_pool: Optional["EventPool"] = None
 
     def send_event(self, event: Event):
         """Communicates an event to the system. Must be implemented by subclasses."""
@@ -40,12 +303,204 @@ class System(ABC):
         self.send_event(event)
         self._process_all_queue_events()
 
-    def _process_all_queue_events(self) -> None:
+    def send_events(self, events: Iterable[Event]) -> None:
+        """Communicates several events to the system, in order, in one call."""
+        self.event_queue.extend(events)
+
+    def send_and_execute_events(self, events: Iterable[Event]) -> None:
+        """Sends several events and then executes them in a single pass."""
+        self.event_queue.extend(events)
+        self._process_all_queue_events()
+
+    def enable_profiling(
+        self, profiler: Optional["EventProfiler"] = None
+    ) -> "EventProfiler":
+        """
+        Starts recording per-event-type counts and handler times.
+        Keeps the current profiler (or uses the given one) and returns it.
+        """
+        if profiler is None:
+            profiler = self.profiler
+        if profiler is None:
+            # pylint: disable=import-outside-toplevel
+            from profiler import EventProfiler
+
+            profiler = EventProfiler()
+        self.profiler = profiler
+        return profiler
+
+    def disable_profiling(self) -> Optional["EventProfiler"]:
+        """
+        Stops profiling and returns the profiler with the results so far.
+        """
+        profiler = self.profiler
+        self.profiler = None
+        return profiler
+
+    def attach_tracer(self, tracer: Optional["EventTracer"]) -> Optional["EventTracer"]:
+        """
+        Attaches a tracer that records every processed event.
+        Passing None detaches the current one. Returns the previous tracer.
+        """
+        previous = self.tracer
+        self.tracer = tracer
+        return previous
+
+    def enable_event_pooling(
+        self,
+        max_size: int = 64,
+        strict: bool = False,
+        pool: Optional["EventPool"] = None,
+    ) -> "EventPool":
+        """
+        Starts recycling processed typed events made with event_factory.
+        Events are only reused if nothing refers to them after processing, see
+        EventPool. Returns the pool, which counts recycled and retained events.
+        Pass an existing pool to share it, e.g. between successive battles.
+        """
+        if pool is None:
+            # pylint: disable=import-outside-toplevel
+            from event_pool import EventPool
+
+            pool = EventPool(max_size, strict)
+        self.event_pool = pool
+        return pool
+
+    def disable_event_pooling(self) -> None:
+        """
+        Stops recycling events.
+        """
+        self.event_pool = None
+
+    def event_factory(self, event_class: Type[E]) -> Callable[..., E]:
+        """
+        Returns a function that makes events of the given class for this system.
+        That is the class itself, or a recycling factory if pooling is enabled.
+        """
+        if self.event_pool is None:
+            return event_class
+        return self.event_pool.factory(event_class)
+
+    def _process_all_queue_events(self, processed: int = 0) -> None:
         """
         Processes elements on the event queue until the queue is empty.
+        Each event is given the next id of this system as it is dequeued,
+        so ids are monotonic in processing order.
+        Raises EventBudgetExceededError if the drain goes over the event budget.
+        processed is how many events the caller already processed for this
+        drain without queueing them, which count towards the budget.
+        """
+        if (
+            self.profiler is not None
+            or self.tracer is not None
+            or self.event_pool is not None
+        ):
+            self._process_all_queue_events_instrumented(processed)
+            return
+        queue = self.event_queue
+        next_id = self._event_ids.__next__
+        # Only the last CYCLE_WINDOW events of the budget are inspected
+        unchecked, window = self._split_event_budget(processed)
+        while queue:
+            if unchecked == 0:
+                self._process_final_budget_window(window)
+                return
+            unchecked -= 1
+            event = queue.popleft()
+            event.id = next_id()
+            self._process_queue_event(event)
+
+    def _split_event_budget(self, processed: int) -> Tuple[int, int]:
+        """
+        Returns how many more events a drain that already processed some may
+        process before it must start watching for cycles, or -1 if there is
+        no budget, and then how many it may process while watching.
+        """
+        if self.event_budget is None:
+            return -1, 0
+        left = max(0, self.event_budget - processed)
+        window = min(left, CYCLE_WINDOW)
+        return left - window, window
+
+    def _process_final_budget_window(self, remaining: int) -> None:
+        """
+        Processes the remaining events allowed by the budget while recording
+        their signatures. If the queue still isn't empty afterwards, raises
+        with the repeating pattern found in them.
+        Events are reported and recycled as in
+        _process_all_queue_events_instrumented.
+        """
+        assert self.event_budget is not None
+        queue = self.event_queue
+        next_id = self._event_ids.__next__
+        profiler = self.profiler
+        tracer = self.tracer
+        pool = self.event_pool
+        perf_counter = time.perf_counter
+        getrefcount = sys.getrefcount
+        history: List[EventSignature] = []
+        while queue:
+            if len(history) == remaining:
+                raise EventBudgetExceededError(self.event_budget, find_cycle(history))
+            depth = len(queue)
+            event = queue.popleft()
+            event.id = next_id()
+            history.append(event_signature(event))
+            if tracer is not None:
+                tracer.record(event)
+            if profiler is None:
+                self._process_queue_event(event)
+            else:
+                start = perf_counter()
+                self._process_queue_event(event)
+                profiler.record(event.code, perf_counter() - start, depth)
+            if pool is not None:
+                refcount = getrefcount(event)
+                pool.release(event, refcount)
+
+    def _process_all_queue_events_instrumented(self, processed: int = 0) -> None:
+        """
+        Same as _process_all_queue_events, but reports each event to the
+        profiler and tracer, recycles it into the event pool, and dumps the
+        tracer if processing raises.
+        Kept separate so the plain loop pays nothing when all of those are off.
         """
-        while self.event_queue:
-            self._process_queue_event(self.event_queue.popleft())
+        queue = self.event_queue
+        next_id = self._event_ids.__next__
+        profiler = self.profiler
+        tracer = self.tracer
+        pool = self.event_pool
+        perf_counter = time.perf_counter
+        getrefcount = sys.getrefcount
+        unchecked, window = self._split_event_budget(processed)
+        try:
+            while queue:
+                if unchecked == 0:
+                    # The pool may hand out the last event again, which
+                    # must not look referenced from here
+                    event = None  # type: ignore[assignment]
+                    self._process_final_budget_window(window)
+                    return
+                unchecked -= 1
+                depth = len(queue)
+                event = queue.popleft()
+                event.id = next_id()
+                if tracer is not None:
+                    tracer.record(event)
+                if profiler is None:
+                    self._process_queue_event(event)
+                else:
+                    start = perf_counter()
+                    self._process_queue_event(event)
+                    profiler.record(event.code, perf_counter() - start, depth)
+                if pool is not None:
+                    # Measured before the call, which adds references of its own
+                    refcount = getrefcount(event)
+                    pool.release(event, refcount)
+        except Exception as error:
+            if tracer is not None:
+                tracer.dump_on_error(error)
+            raise
 
     @abstractmethod
     def _process_queue_event(self, event: Event) -> None:
@@ -0,0 +1,352 @@
+import io
+import json
+import unittest
+
+from system import System, Event, EventBudgetExceededError, event_type_code
+from tracer import EventTracer
+from event_pool import PooledEventRetainedError
+from event_queue import PriorityEventQueue
+from events import DamageEvent, DeathEvent, RollEvent
+from boi import BoiBuilder
+from team import Team
+from battle_system import BattleSystem
+
+
+class RecordingSystem(System):
+    """Minimal system that records the events it processes"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.processed = []
+
+    def _process_queue_event(self, event: Event) -> None:
+        self.processed.append(event)
+
+
+class SystemTest(unittest.TestCase):
+    """Test cases for the System event framework"""
+
+    def setUp(self):
+        """Set up test environment before each test"""
+        self.system = RecordingSystem()
+
+    def test_event_ids_are_monotonic_per_system(self):
+        """Test that processed events get increasing ids from their system"""
+        for _ in range(3):
+            self.system.send_event(Event(type="ping"))
+        self.system._process_all_queue_events()
+
+        ids = [event.id for event in self.system.processed]
+        self.assertEqual(ids, [0, 1, 2])
+
+        # Another system numbers its events independently
+        other = RecordingSystem()
+        other.send_and_execute_event(Event(type="ping"))
+        self.assertEqual(other.processed[0].id, 0)
+
+    def test_send_events_queues_in_order(self):
+        """Test that batches are queued in order and only run when executed"""
+        self.system.send_events(Event(type="ping", n=n) for n in range(3))
+        self.system.send_events([])
+        self.assertEqual(self.system.processed, [])
+        self.assertEqual([event.n for event in self.system.event_queue], [0, 1, 2])
+        self.assertTrue(all(event.id is None for event in self.system.event_queue))
+
+        self.system._process_all_queue_events()
+        self.assertEqual([event.n for event in self.system.processed], [0, 1, 2])
+        self.assertEqual([event.id for event in self.system.processed], [0, 1, 2])
+
+    def test_send_and_execute_events_runs_the_batch(self):
+        """Test that a batch runs after anything already queued, in one drain"""
+        self.system.send_event(Event(type="ping", n=0))
+        self.system.send_and_execute_events(
+            Event(type="pong", n=n) for n in range(1, 4)
+        )
+        self.assertEqual([event.n for event in self.system.processed], [0, 1, 2, 3])
+        self.assertEqual([event.id for event in self.system.processed], [0, 1, 2, 3])
+        self.assertEqual(len(self.system.event_queue), 0)
+
+        # An empty batch still runs whatever is queued
+        self.system.send_and_execute_events([])
+        self.assertEqual(len(self.system.processed), 4)
+        self.system.send_event(Event(type="ping", n=4))
+        self.system.send_and_execute_events(iter(()))
+        self.assertEqual(self.system.processed[-1].id, 4)
+
+    def test_event_uuid_is_lazy_and_stable(self):
+        """Test that the uuid is only generated when asked for"""
+        event = Event(type="ping")
+        self.assertIsNone(event._uuid)
+        self.assertEqual(event.uuid, event.uuid)
+        self.assertEqual(len(event.uuid), 36)
+
+    def test_typed_and_ad_hoc_events_share_codes(self):
+        """Test that Event(type=...) still works alongside typed events"""
+        boi = BoiBuilder().set_type_name("Ant").set_attack(2).set_health(5).build()
+        typed = DamageEvent(target=boi, source=None, damage=2)
+        ad_hoc = Event(type="damage", target=boi, source=None, damage=2)
+
+        self.assertEqual(typed.code, ad_hoc.code)
+        self.assertEqual(typed.type, "damage")
+        self.assertEqual(typed.data, ad_hoc.data)
+        self.assertEqual(ad_hoc.damage, 2)
+
+        # Both dispatch to the standard damage callback
+        boi.trigger(typed, self.system)
+        boi.trigger(ad_hoc, self.system)
+        self.assertEqual(boi.health, 1)
+
+    def test_subscribe_filters_by_event_type(self):
+        """Test that typed subscriptions only see the types they asked for"""
+        team0 = Team(
+            [BoiBuilder().set_type_name("Ant").set_attack(2).set_health(1).build()]
+        )
+        team1 = Team(
+            [BoiBuilder().set_type_name("Dodo").set_attack(1).set_health(3).build()]
+        )
+        everything = []
+        deaths = []
+        battle = BattleSystem(team0, team1, [everything.append])
+        battle.subscribe(deaths.append, types={"death"})
+
+        while not battle.is_battle_over():
+            battle.run_turn()
+
+        self.assertTrue(deaths)
+        self.assertTrue(all(event.type == "death" for event in deaths))
+        self.assertEqual(deaths, [e for e in everything if e.type == "death"])
+
+        battle.unsubscribe(deaths.append)
+        self.assertEqual(battle.event_callbacks, [everything.append])
+
+    def test_observers_added_directly_or_by_type_name(self):
+        """Test that appended callbacks and single type names are honoured"""
+        appended = []
+        deaths = []
+        battle = BattleSystem(
+            Team(
+                [BoiBuilder().set_type_name("Ant").set_attack(2).set_health(1).build()]
+            ),
+            Team(
+                [BoiBuilder().set_type_name("Dodo").set_attack(1).set_health(3).build()]
+            ),
+        )
+        battle.event_callbacks.append(appended.append)
+        battle.subscribe(deaths.append, types="death")
+        battle.run_turn()
+
+        self.assertTrue(appended)
+        self.assertEqual([event.type for event in deaths], ["death"])
+
+    def test_observers_added_to_the_callers_list(self):
+        """Test that the system keeps the list it was given, not a copy"""
+        callbacks = []
+        battle = BattleSystem(
+            Team(
+                [BoiBuilder().set_type_name("Ant").set_attack(2).set_health(1).build()]
+            ),
+            Team(
+                [BoiBuilder().set_type_name("Dodo").set_attack(1).set_health(3).build()]
+            ),
+            callbacks,
+        )
+        self.assertIs(battle.event_callbacks, callbacks)
+        damage = []
+        late = []
+
+        def add_late_observer(event: Event) -> None:
+            if event.type == "attack" and not late:
+                callbacks.append(late.append)
+
+        callbacks.append(add_late_observer)
+        battle.subscribe(damage.append, types="damage")
+        battle.run_turn()
+
+        self.assertEqual(len(damage), 2)
+        self.assertEqual(callbacks, [add_late_observer, damage.append, late.append])
+        # Added while the first attack was processed, so it hears what follows
+        self.assertEqual(late[0].type, "damage")
+
+    def test_profiling_counts_event_types(self):
+        """Test that profiling records per-type counts only while enabled"""
+        self.system.send_and_execute_event(Event(type="ping"))
+        profiler = self.system.enable_profiling()
+        for _ in range(3):
+            self.system.send_event(Event(type="ping"))
+        self.system.send_event(Event(type="pong"))
+        self.system._process_all_queue_events()
+        self.assertIs(self.system.disable_profiling(), profiler)
+        self.system.send_and_execute_event(Event(type="ping"))
+
+        results = json.loads(profiler.to_json())
+        self.assertEqual(results["peak_queue_depth"], 4)
+        self.assertEqual(results["event_types"]["ping"]["count"], 3)
+        self.assertEqual(results["event_types"]["ping"]["peak_queue_depth"], 4)
+        self.assertEqual(results["event_types"]["pong"]["count"], 1)
+
+    def test_tracer_keeps_last_events_and_dumps_on_error(self):
+        """Test that the tracer ring buffer wraps and is dumped on exceptions"""
+        out = io.StringIO()
+        tracer = EventTracer(capacity=3, file=out)
+        self.system.attach_tracer(tracer)
+        for _ in range(5):
+            self.system.send_event(Event(type="ping"))
+        self.system._process_all_queue_events()
+
+        ping = event_type_code("ping")
+        self.assertEqual(tracer.entries(), [(i, ping, -1, -1, 0) for i in range(2, 5)])
+
+        def explode(_: Event) -> None:
+            raise ValueError("boom")
+
+        self.system._process_queue_event = explode
+        self.system.send_event(Event(type="ping"))
+        with self.assertRaises(ValueError):
+            self.system._process_all_queue_events()
+        self.assertIn("Last 3 events before ValueError: boom", out.getvalue())
+        self.assertIn("#5 ping", out.getvalue())
+
+    def test_priority_queue_orders_by_phase_priority_then_sequence(self):
+        """Test that the priority backend is deterministic and FIFO on ties"""
+        queue = PriorityEventQueue(
+            phases={"early": 0, "late": 1},
+            priority=lambda event: event.data.get("priority", 0),
+        )
+        system = RecordingSystem()
+        system.event_queue = queue
+        system.send_events(
+            [
+                Event(type="late", n=0),
+                Event(type="early", n=1, priority=1),
+                Event(type="early", n=2),
+                Event(type="late", n=3),
+            ]
+        )
+        system.send_event(Event(type="early", n=4))
+        system._process_all_queue_events()
+
+        self.assertEqual([event.n for event in system.processed], [2, 4, 1, 0, 3])
+        self.assertEqual(len(queue), 0)
+
+    def test_priority_queue_copies_keep_order(self):
+        """Test that a copied queue and its events are independent of the original"""
+        queue = PriorityEventQueue(phases={"early": 0, "late": 1})
+        queue.extend([Event(type="late", n=1), DamageEvent(1, 2, 3)])
+        copied = queue.copy(lambda event: event.copy(lambda n: n and n * 10))
+        for q in (queue, copied):
+            q.append(Event(type="early", n=4))
+
+        damage, early, late = (copied.popleft() for _ in range(3))
+        self.assertEqual((damage.target, damage.source, damage.damage), (10, 20, 30))
+        self.assertIsNone(damage.id)
+        self.assertEqual((early.n, late.n, late.type), (4, 10, "late"))
+        self.assertEqual(queue.popleft().damage, 3)
+        self.assertEqual([queue.popleft().n for _ in range(2)], [4, 1])
+
+    def test_event_budget_reports_repeating_events(self):
+        """Test that a runaway cascade is stopped with its repeating pattern"""
+
+        def ping_pong(event: Event) -> None:
+            reply = "pong" if event.type == "ping" else "ping"
+            self.system.send_event(Event(type=reply))
+
+        self.system._process_queue_event = ping_pong
+        self.system.event_budget = 200
+        self.system.send_event(Event(type="ping"))
+
+        with self.assertRaises(EventBudgetExceededError) as caught:
+            self.system._process_all_queue_events()
+        self.assertEqual(len(caught.exception.cycle), 2)
+        self.assertEqual({name for name, _ in caught.exception.cycle}, {"ping", "pong"})
+        self.assertEqual(next(self.system._event_ids), 200)
+
+    def test_event_budget_window_is_profiled_and_pooled(self):
+        """Test that the events checked for cycles are instrumented like others"""
+        profiler = self.system.enable_profiling()
+        pool = self.system.enable_event_pooling()
+        make_roll = self.system.event_factory(RollEvent)
+
+        def roll_again(event: Event) -> None:
+            self.system.send_event(make_roll())
+
+        self.system._process_queue_event = roll_again
+        self.system.event_budget = 200
+        self.system.send_event(make_roll())
+        with self.assertRaises(EventBudgetExceededError):
+            self.system._process_all_queue_events()
+        self.assertEqual(profiler.stats[RollEvent.code].count, 200)
+        self.assertEqual((pool.recycled, pool.retained), (200, 0))
+
+    def test_runaway_battle_can_end_in_a_draw(self):
+        """Test that draw_on_runaway turns an infinite trigger loop into a draw"""
+
+        def undying_callback(boi, system, event):
+            system.send_event(DeathEvent(target=boi))
+
+        phoenix = (
+            BoiBuilder()
+            .set_type_name("Phoenix")
+            .set_attack(1)
+            .set_health(1)
+            .add_trigger("death", undying_callback)
+            .build()
+        )
+        dodo = BoiBuilder().set_type_name("Dodo").set_attack(3).set_health(3).build()
+        battle = BattleSystem(Team([phoenix]), Team([dodo]), draw_on_runaway=True)
+        battle.run_turn()
+
+        self.assertTrue(battle.is_battle_over())
+        self.assertIsNone(battle.get_winner())
+        self.assertEqual(battle.runaway.cycle, (("death", "Phoenix"),))
+
+    def test_event_pool_only_recycles_unreferenced_events(self):
+        """Test that pooled events are reused unless an observer holds them"""
+
+        def make_battle(event_callbacks=None):
+            return BattleSystem(
+                Team(
+                    [
+                        BoiBuilder()
+                        .set_type_name("Ant")
+                        .set_attack(1)
+                        .set_health(3)
+                        .build()
+                    ]
+                ),
+                Team(
+                    [
+                        BoiBuilder()
+                        .set_type_name("Bee")
+                        .set_attack(1)
+                        .set_health(3)
+                        .build()
+                    ]
+                ),
+                event_callbacks,
+            )
+
+        battle = make_battle()
+        pool = battle.enable_event_pooling()
+        while not battle.is_battle_over():
+            battle.run_turn()
+        self.assertGreater(pool.recycled, 0)
+        self.assertEqual(pool.retained, 0)
+
+        held = []
+        battle = make_battle([held.append])
+        pool = battle.enable_event_pooling()
+        held.clear()
+        battle.run_turn()
+        self.assertEqual(pool.recycled, 0)
+        self.assertEqual(pool.retained, len(held))
+        # Held events were not reused for later events
+        self.assertEqual(len(set(map(id, held))), len(held))
+
+        battle = make_battle([held.append])
+        battle.enable_event_pooling(strict=True)
+        with self.assertRaises(PooledEventRetainedError):
+            battle.run_turn()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,5 +11,7 @@ MAX_TEAM_SIZE = 5
 class Team:
     """Represents a team of entities in the game."""
 
+    __slots__ = ("bois",)
+
     def __init__(self, bois: List[Boi]) -> None:
         self.bois = bois
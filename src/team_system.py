@@ -4,12 +4,24 @@ This is the base class for team-related systems in the game.
 These include the BattleSystem and the ShopSystem.
 """
 
-from typing import List, Optional
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 from abc import ABC, abstractmethod
+from collections import deque
+import itertools
 
-from boi import Boi
-from system import System, Event, EventCallback
+from boi import Boi, DEFAULT_BOI_IDS
+from system import System, Event, EventCallback, event_type_code
+from events import DeathEvent
 from team import Team
+from event_queue import EventQueue
 
 
 class TeamSystem(System, ABC):
@@ -22,10 +34,35 @@ class TeamSystem(System, ABC):
     This class includes these functionalities.
     """
 
-    def __init__(self, teams: List[Team], event_callbacks: List[EventCallback]) -> None:
-        super().__init__()
-        self.event_callbacks = event_callbacks
+    def __init__(
+        self,
+        teams: List[Team],
+        event_callbacks: List[EventCallback],
+        event_queue: Optional[EventQueue] = None,
+        boi_id_seed: Optional[int] = None,
+    ) -> None:
+        """
+        Bois the system builds get ids counting up from boi_id_seed, which
+        makes them reproducible. Without a seed they come from DEFAULT_BOI_IDS.
+        """
+        super().__init__(event_queue)
+        self.boi_ids: Iterator[int] = (
+            DEFAULT_BOI_IDS if boi_id_seed is None else itertools.count(boi_id_seed)
+        )
+        # The caller's list, which it may keep changing
+        self._event_callbacks: List[EventCallback] = []
+        # Event type codes callbacks were subscribed to. Others want the types
+        # in their event_types (see observes), or every event without them.
+        self._callback_codes: Dict[EventCallback, FrozenSet[int]] = {}
+        # Interested callbacks per event type code, filled in lazily, and the
+        # callbacks it was filled in from, see _check_observers
+        self._observer_index: Dict[int, Tuple[EventCallback, ...]] = {}
+        self._indexed_callbacks: List[EventCallback] = []
+        # Per-boi events no boi or observer reacts to are not sent,
+        # see _skips_unheard
+        self.skip_unheard_events: bool = True
         self.teams = teams
+        self.event_callbacks = event_callbacks
 
     def send_event(self, event: Event) -> None:
         """
@@ -35,6 +72,48 @@ class TeamSystem(System, ABC):
         """
         self.event_queue.append(event)
 
+    @property
+    def event_callbacks(self) -> List[EventCallback]:
+        """
+        The observers notified of events, in order. This is the list the
+        system was given, not a copy. Callbacks can be added with subscribe,
+        or to the list directly, in which case they are notified of the types
+        in their event_types (see observes), or of every event.
+        """
+        return self._event_callbacks
+
+    @event_callbacks.setter
+    def event_callbacks(self, callbacks: List[EventCallback]) -> None:
+        self._event_callbacks = callbacks
+        self._observers_changed()
+
+    def subscribe(
+        self, callback: EventCallback, types: Optional[Iterable[str]] = None
+    ) -> None:
+        """
+        Registers a callback to be notified of events of the given types,
+        which may also be a single type name.
+        If no types are given, the callback's event_types (see observes) are used.
+        Failing that, the callback is notified of every event.
+        """
+        if isinstance(types, str):
+            types = (types,)
+        if types is None:
+            self._callback_codes.pop(callback, None)
+        else:
+            self._callback_codes[callback] = frozenset(map(event_type_code, types))
+        self._event_callbacks.append(callback)
+        self._observers_changed()
+
+    def unsubscribe(self, callback: EventCallback) -> None:
+        """
+        Removes a callback registered with subscribe.
+        """
+        self._event_callbacks.remove(callback)
+        if callback not in self._event_callbacks:
+            self._callback_codes.pop(callback, None)
+        self._observers_changed()
+
     def num_teams(self) -> int:
         """
         Returns the number of teams.
@@ -83,27 +162,85 @@ class TeamSystem(System, ABC):
                 team.bois.remove(boi)
                 break  # Assumes bois are unique to teams
 
+    def _observers_changed(self) -> None:
+        self._observer_index.clear()
+        self._indexed_callbacks = list(self._event_callbacks)
+
+    def _check_observers(self) -> None:
+        """
+        Clears the observer index if the callbacks changed since it was
+        filled in. They may be changed at any time, e.g. by an observer.
+        """
+        if self._event_callbacks != self._indexed_callbacks:
+            self._observers_changed()
+
+    def _callback_wants(self, callback: EventCallback, code: int) -> bool:
+        """Check if a callback wants events with the given type code."""
+        codes = self._callback_codes.get(callback)
+        if codes is None:
+            types = getattr(callback, "event_types", None)
+            if types is None:
+                return True
+            codes = frozenset(map(event_type_code, types))
+        return code in codes
+
+    def _observers(self, code: int) -> Tuple[EventCallback, ...]:
+        """Returns the registered callbacks interested in the event type."""
+        self._check_observers()
+        observers = self._observer_index.get(code)
+        if observers is None:
+            observers = tuple(
+                callback
+                for callback in self._event_callbacks
+                if self._callback_wants(callback, code)
+            )
+            self._observer_index[code] = observers
+        return observers
+
     def _notify_callbacks(self, event: Event):
-        """Notify all registered callbacks of the event."""
-        for callback in self.event_callbacks:
+        """Notify all registered callbacks interested in the event."""
+        for callback in self._observers(event.code):
             callback(event)
 
+    def _skips_unheard(self, code: int) -> bool:
+        """
+        Check if per-boi events of the given type can be left out for bois
+        that don't react to them. Not if an observer, tracer or profiler
+        wants every event, or if events are already queued ahead of them.
+        Nor with a queue that isn't first in, first out, which could put
+        events the triggers send ahead of later bois' events.
+        """
+        return (
+            self.skip_unheard_events
+            and type(self.event_queue) is deque
+            and self.tracer is None
+            and self.profiler is None
+            and not self.event_queue
+            and not self._observers(code)
+        )
+
     def _process_queue_event(self, event: Event) -> None:
-        self._notify_callbacks(event)
+        # Inlined _check_observers
+        if self._event_callbacks != self._indexed_callbacks:
+            self._observers_changed()
+        # Skip the call entirely for event types known to have no observers
+        observers = self._observer_index.get(event.code)
+        if observers is None or observers:
+            self._notify_callbacks(event)
         # If the event has a target make sure to notify them
-        if "target" in event.data:
+        if event.target is not None:
             self._handle_target_boi(event)
         # Generally, the BattleSystem should just pass on events
         # However, death is a special event type
         # Since it leads to the removal of a Boi from their team
-        if event.type == "death":
+        if event.code == DeathEvent.code:
             self._handle_death(event)
 
     def _handle_target_boi(self, event: Event) -> None:
         """
         Handle the targeting of a Boi in the battle with the given event.
         """
-        target = event.data["target"]
+        target = event.target
         assert isinstance(target, Boi)
         target.trigger(event, self)
 
@@ -112,4 +249,4 @@ class TeamSystem(System, ABC):
         Handle the death of a Boi in the battle with the given event.
         """
         # Assume target is already validated
-        self._remove_boi(event.data["target"])
+        self._remove_boi(event.target)
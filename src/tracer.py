@@ -0,0 +1,136 @@
+"""
+Bounded ring-buffer tracer of the events a system processes.
+Used for post-mortem debugging of a system that raised mid-simulation.
+"""
+
+import sys
+from array import array
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, TextIO, Tuple
+
+from system import EVENT_TYPE_NAMES, Event, System
+
+# (event id, type code, target id, source id, scalar payload)
+TraceEntry = Tuple[int, int, int, int, int]
+
+NO_OBJECT = -1
+
+
+def _object_id(obj: Any) -> int:
+    """
+    Returns the compact id used to trace an event's target or source.
+    That is a boi's integer id, or the object's address for anything else.
+    """
+    if obj is None:
+        return NO_OBJECT
+    obj_id = getattr(obj, "id", None)
+    return obj_id if isinstance(obj_id, int) else id(obj)
+
+
+class EventTracer:
+    """
+    Keeps the last `capacity` events processed by the systems it is attached to.
+    Events are stored column-wise in preallocated arrays, so recording an
+    event only overwrites slots and never grows the buffer.
+    The buffer is dumped when an exception escapes event processing.
+    """
+
+    def __init__(self, capacity: int = 256, file: Optional[TextIO] = None) -> None:
+        if capacity < 1:
+            raise ValueError("Tracer capacity must be positive")
+        self.capacity = capacity
+        self.file = file
+        self._ids = array("q", bytes(8 * capacity))
+        self._codes = array("i", bytes(4 * capacity))
+        self._targets = array("q", bytes(8 * capacity))
+        self._sources = array("q", bytes(8 * capacity))
+        self._payloads = array("q", bytes(8 * capacity))
+        self._cursor = 0
+        self._wrapped = False
+        self._last_dumped: Optional[BaseException] = None
+
+    def record(self, event: Event) -> None:
+        """
+        Records an event, overwriting the oldest one once the buffer is full.
+        """
+        i = self._cursor
+        self._ids[i] = event.id if event.id is not None else NO_OBJECT
+        self._codes[i] = event.code
+        self._targets[i] = _object_id(event.target)
+        self._sources[i] = _object_id(event.source)
+        payload = event.PAYLOAD
+        self._payloads[i] = getattr(event, payload) if payload else 0
+        i += 1
+        if i == self.capacity:
+            i = 0
+            self._wrapped = True
+        self._cursor = i
+
+    def clear(self) -> None:
+        """
+        Forgets all recorded events.
+        """
+        self._cursor = 0
+        self._wrapped = False
+
+    def __len__(self) -> int:
+        return self.capacity if self._wrapped else self._cursor
+
+    def entries(self) -> List[TraceEntry]:
+        """
+        Returns the recorded events, oldest first.
+        """
+        if self._wrapped:
+            order = list(range(self._cursor, self.capacity)) + list(range(self._cursor))
+        else:
+            order = list(range(self._cursor))
+        return [
+            (
+                self._ids[i],
+                self._codes[i],
+                self._targets[i],
+                self._sources[i],
+                self._payloads[i],
+            )
+            for i in order
+        ]
+
+    def dump(self, file: Optional[TextIO] = None, reason: str = "") -> None:
+        """
+        Writes the recorded events, oldest first, one per line.
+        """
+        out = file or self.file or sys.stderr
+        header = f"Last {len(self)} events"
+        if reason:
+            header += f" before {reason}"
+        print(header + ":", file=out)
+        for event_id, code, target, source, payload in self.entries():
+            print(
+                f"  #{event_id} {EVENT_TYPE_NAMES[code]}"
+                f" target={target} source={source} payload={payload}",
+                file=out,
+            )
+
+    def dump_on_error(self, error: BaseException) -> None:
+        """
+        Dumps the buffer for an exception, once per exception.
+        """
+        if error is self._last_dumped:
+            return
+        self._last_dumped = error
+        self.dump(reason=f"{type(error).__name__}: {error}")
+
+    @contextmanager
+    def watch(self, system: System) -> Iterator["EventTracer"]:
+        """
+        Attaches the tracer to a system for the duration of a with block.
+        Dumps the buffer if the block raises, e.g. from BattleSystem.run_turn.
+        """
+        previous = system.attach_tracer(self)
+        try:
+            yield self
+        except Exception as error:
+            self.dump_on_error(error)
+            raise
+        finally:
+            system.tracer = previous
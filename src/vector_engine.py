@@ -0,0 +1,141 @@
+"""
+NumPy battle engine for batches of vanilla battles, whose bois only have
+the default triggers. Such battles depend only on each team's ordered
+(attack, health) list, so thousands of them can be run a turn at a time
+on arrays instead of through BattleSystem's bois and events.
+Needs NumPy, which the rest of the game doesn't.
+"""
+
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from batch_runner import DEFAULT_MAX_TURNS, BattleResult, Survivor
+from resolver import VanillaTeam
+
+NO_WINNER = -1
+
+
+class VanillaBatch:
+    """
+    Runs many vanilla battles at once, with the same results as BattleSystem.
+
+    Each turn, in every battle still going, the two front bois damage each
+    other at the same time, and those left with no health die and are
+    removed. A battle is over once a team is empty. As in BattleSystem,
+    team 1 wins when both teams run out on the same turn.
+
+    attack and health hold every boi's stats, indexed by battle, team and
+    position, padded with zeros up to the biggest team. front is the
+    position of each team's front boi, so a team's survivors are the bois
+    from front up to its size.
+    """
+
+    def __init__(self, matchups: Sequence[Tuple[VanillaTeam, VanillaTeam]]) -> None:
+        num_battles = len(matchups)
+        max_size = max(
+            (len(team) for matchup in matchups for team in matchup), default=0
+        )
+        self.attack = np.zeros((num_battles, 2, max_size), dtype=np.int64)
+        self.health = np.zeros((num_battles, 2, max_size), dtype=np.int64)
+        self.size = np.zeros((num_battles, 2), dtype=np.int64)
+        for battle, matchup in enumerate(matchups):
+            for side, team in enumerate(matchup):
+                if len(team) == 0:
+                    raise ValueError(f"Battle {battle} has an empty team.")
+                stats = np.asarray(team, dtype=np.int64).reshape(len(team), 2)
+                self.attack[battle, side, : len(team)] = stats[:, 0]
+                self.health[battle, side, : len(team)] = stats[:, 1]
+                self.size[battle, side] = len(team)
+        self.front = np.zeros((num_battles, 2), dtype=np.int64)
+        self.turns = np.zeros(num_battles, dtype=np.int64)
+        # NO_WINNER until a battle is over, and after if it's a draw
+        self.winner = np.full(num_battles, NO_WINNER, dtype=np.int64)
+        self.over = np.zeros(num_battles, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def run(self, max_turns: int = DEFAULT_MAX_TURNS) -> "VanillaBatch":
+        """
+        Runs turns until every battle is over or has had max_turns turns.
+        Returns the batch itself.
+        """
+        rows = np.flatnonzero(~self.over & (self.turns < max_turns))
+        while rows.size:
+            self._run_turn(rows)
+            rows = rows[~self.over[rows] & (self.turns[rows] < max_turns)]
+        return self
+
+    def _run_turn(self, rows: np.ndarray) -> None:
+        """
+        Runs one turn of the given battles, none of which are over.
+        """
+        front0 = self.front[rows, 0]
+        front1 = self.front[rows, 1]
+        # Both fronts attack with the attack they had before taking damage
+        attack0 = self.attack[rows, 0, front0]
+        attack1 = self.attack[rows, 1, front1]
+        health0 = self.health[rows, 0, front0] - attack1
+        health1 = self.health[rows, 1, front1] - attack0
+        self.health[rows, 0, front0] = health0
+        self.health[rows, 1, front1] = health1
+        self.front[rows, 0] = front0 + (health0 <= 0)
+        self.front[rows, 1] = front1 + (health1 <= 0)
+        self.turns[rows] += 1
+
+        empty0 = self.front[rows, 0] >= self.size[rows, 0]
+        empty1 = self.front[rows, 1] >= self.size[rows, 1]
+        self.winner[rows[empty1]] = 0
+        # Team 1 also wins a mutual wipe out, like BattleSystem
+        self.winner[rows[empty0]] = 1
+        self.over[rows[empty0 | empty1]] = True
+
+    def get_winner(self, battle: int) -> Optional[int]:
+        """
+        Returns the winning team of a battle, or None if it's a draw or
+        isn't over.
+        """
+        winner = int(self.winner[battle])
+        return None if winner == NO_WINNER else winner
+
+    def survivors(self, battle: int) -> Tuple[List[Survivor], List[Survivor]]:
+        """
+        Returns each team's remaining bois in a battle, named like the bois
+        batch_runner.build_team makes.
+        """
+        teams: Tuple[List[Survivor], List[Survivor]] = ([], [])
+        for side in (0, 1):
+            for position in range(self.front[battle, side], self.size[battle, side]):
+                teams[side].append(
+                    (
+                        f"Boi {position}",
+                        int(self.attack[battle, side, position]),
+                        int(self.health[battle, side, position]),
+                    )
+                )
+        return teams
+
+    def results(self, first_index: int = 0) -> Iterator[BattleResult]:
+        """
+        Yields a BattleResult per battle, as batch_runner.run_battle would
+        give, with indices counting up from first_index.
+        """
+        for battle in range(len(self)):
+            yield BattleResult(
+                first_index + battle,
+                self.get_winner(battle),
+                int(self.turns[battle]),
+                self.survivors(battle),
+                timed_out=not self.over[battle],
+            )
+
+
+def run_vanilla_battles(
+    matchups: Sequence[Tuple[VanillaTeam, VanillaTeam]],
+    max_turns: int = DEFAULT_MAX_TURNS,
+) -> List[BattleResult]:
+    """
+    Runs vanilla battles to completion on arrays, see VanillaBatch.
+    """
+    return list(VanillaBatch(matchups).run(max_turns).results())
@@ -0,0 +1,58 @@
+import random
+import unittest
+
+from batch_runner import run_battle
+
+try:
+    import vector_engine
+except ImportError:  # NumPy isn't installed
+    vector_engine = None
+
+
+def random_team(rng, max_stat):
+    """A random vanilla team of 1 to 5 bois, possibly with 0 attack or health"""
+    return [
+        (rng.randint(0, max_stat), rng.randint(0, max_stat))
+        for _ in range(rng.randint(1, 5))
+    ]
+
+
+@unittest.skipIf(vector_engine is None, "needs NumPy")
+class VanillaBatchTest(unittest.TestCase):
+    """Test cases for the NumPy vanilla battle engine"""
+
+    def test_matches_battle_system(self):
+        """Test that winners, turns and survivors match the event engine"""
+        rng = random.Random(0)
+        matchups = [
+            (random_team(rng, max_stat), random_team(rng, max_stat))
+            for max_stat in (1, 3, 10)
+            for _ in range(300)
+        ]
+        # Both teams wiped out together, and a stalemate
+        matchups += [([(3, 3)], [(3, 3)]), ([(0, 2)], [(0, 5), (1, 1)])]
+
+        results = vector_engine.run_vanilla_battles(matchups, max_turns=50)
+        for index, (matchup, result) in enumerate(zip(matchups, results)):
+            expected = run_battle(index, matchup, max_turns=50, use_resolver=False)
+            self.assertEqual(
+                (result.winner, result.turns, result.survivors, result.timed_out),
+                (
+                    expected.winner,
+                    expected.turns,
+                    expected.survivors,
+                    expected.timed_out,
+                ),
+                matchup,
+            )
+        self.assertEqual(results[-2].winner, 1)
+        self.assertTrue(results[-1].timed_out)
+
+    def test_empty_teams_are_refused(self):
+        """Test that battles BattleSystem can't run are refused up front"""
+        with self.assertRaises(ValueError):
+            vector_engine.VanillaBatch([([(1, 1)], [])])
+
+
+if __name__ == "__main__":
+    unittest.main()